@@ -0,0 +1,81 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from app.api.schemas.documents import (
+    ChunkPageResponse,
+    DocumentListResponse,
+    SectionPageResponse,
+    StoredDocument,
+    StoredSection,
+)
+from app.api.schemas.ocr_chunking import OCRChunk
+from app.config.settings import settings
+from app.services.chunk_store import chunk_store
+
+
+router = APIRouter()
+
+Offset = Query(0, ge=0)
+Limit = Query(100, ge=1, le=settings.chunk_store_page_max)
+
+
+@router.get("/documents", response_model=DocumentListResponse)
+async def list_documents(
+    checksum_sha256: Optional[str] = None, offset: int = Offset, limit: int = Limit
+) -> DocumentListResponse:
+    """Stored documents, optionally only those OCR'd from a file with this checksum."""
+    rows = await chunk_store.documents(checksum_sha256, offset, limit)
+    return DocumentListResponse(documents=[StoredDocument(**row) for row in rows])
+
+
+@router.get("/documents/{document_id}", response_model=StoredDocument)
+async def get_document(document_id: str) -> StoredDocument:
+    return await _document(document_id)
+
+
+@router.get("/documents/{document_id}/sections", response_model=SectionPageResponse)
+async def get_sections(
+    document_id: str, title: Optional[str] = None, offset: int = Offset, limit: int = Limit
+) -> SectionPageResponse:
+    """Sections of a stored document; ``title`` looks up sections by their exact heading."""
+    await _document(document_id)
+    total, rows = await chunk_store.sections(document_id, offset, limit, title)
+    return SectionPageResponse(
+        document_id=document_id, total=total, offset=offset, sections=[StoredSection(**row) for row in rows]
+    )
+
+
+@router.get("/documents/{document_id}/chunks", response_model=ChunkPageResponse)
+async def get_chunks(
+    document_id: str,
+    section_title: Optional[str] = None,
+    section: Optional[int] = Query(None, ge=0, description="Section seq from the sections endpoint"),
+    offset: int = Offset,
+    limit: int = Limit,
+) -> ChunkPageResponse:
+    """
+    Page through the stored chunks of a document, as the pipeline returned
+    them, without re-running OCR.
+    """
+    await _document(document_id)
+    total, rows = await chunk_store.chunks(document_id, offset, limit, section_title, section)
+    return ChunkPageResponse(
+        document_id=document_id,
+        total=total,
+        offset=offset,
+        chunks=[OCRChunk(content=content, metadata=metadata) for content, metadata in rows],
+    )
+
+
+@router.get("/documents/{document_id}/chunks/{chunk_id:path}", response_model=OCRChunk)
+async def get_chunk(document_id: str, chunk_id: str) -> OCRChunk:
+    row = await chunk_store.chunk(document_id, chunk_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Chunk {chunk_id} of document {document_id} not found.")
+    return OCRChunk(content=row[0], metadata=row[1])
+
+
+async def _document(document_id: str) -> StoredDocument:
+    row = await chunk_store.document(document_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Document {document_id} not found.")
+    return StoredDocument(**row)
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, HTTPException
+from app.api.schemas.ocr_chunking import OCRChunkingRequest
+from app.api.schemas.jobs import JobStatusResponse, JobSubmitResponse
+from app.config.settings import settings
+from app.services.job_service import JobQueueFullError, job_service
+
+
+router = APIRouter()
+
+
+@router.post("/jobs", response_model=JobSubmitResponse, status_code=202)
+async def submit_job(payload: OCRChunkingRequest) -> JobSubmitResponse:
+    """
+    Queue an OCR-chunking job and return its id immediately.
+    Poll GET /jobs/{job_id} for the status and the result.
+    """
+    try:
+        job = await job_service.submit(payload)
+    except JobQueueFullError as exc:
+        raise HTTPException(
+            status_code=503,
+            detail=str(exc),
+            headers={"Retry-After": str(settings.job_retry_after_seconds)},
+        )
+    return JobSubmitResponse(**job)
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str) -> JobStatusResponse:
+    job = await job_service.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+    return JobStatusResponse(**job)
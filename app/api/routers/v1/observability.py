@@ -0,0 +1,56 @@
+from typing import Any, Dict
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse, Response
+from app.config.settings import settings
+from app.utils.metrics import render
+from app.utils.sampling_profiler import profiler
+
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def metrics() -> Response:
+    """Prometheus exposition of this worker, or of all workers in multiprocess mode."""
+    content, media_type = render()
+    return Response(content, media_type=media_type)
+
+
+@router.get("/debug/profiler")
+async def profiler_status() -> Dict[str, Any]:
+    _check_profiler()
+    return profiler.status()
+
+
+@router.post("/debug/profiler/start")
+async def profiler_start(
+    interval_ms: float = Query(10.0, ge=1.0, le=1000.0),
+    duration: float = Query(60.0, gt=0),
+) -> Dict[str, Any]:
+    """
+    Start sampling this worker's threads. Stops by itself after ``duration``
+    seconds (at most ``profiler_max_seconds``).
+    """
+    _check_profiler()
+    profiler.start(interval_ms / 1000, min(duration, settings.profiler_max_seconds))
+    return profiler.status()
+
+
+@router.post("/debug/profiler/stop", response_class=PlainTextResponse)
+async def profiler_stop() -> str:
+    """Stop sampling and return the collapsed stacks (flamegraph input)."""
+    _check_profiler()
+    profiler.stop()
+    return profiler.collapsed()
+
+
+@router.get("/debug/profiler/stacks", response_class=PlainTextResponse)
+async def profiler_stacks() -> str:
+    """Collapsed stacks sampled so far, without stopping."""
+    _check_profiler()
+    return profiler.collapsed()
+
+
+def _check_profiler() -> None:
+    if not settings.profiler_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
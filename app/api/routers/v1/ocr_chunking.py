@@ -1,30 +1,84 @@
-from fastapi import APIRouter, HTTPException, Request
+import json
+
+import httpx
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from app.api.schemas.ocr_chunking import (
+    BatchOCRChunkingItem,
+    BatchOCRChunkingRequest,
+    CallbackWebhooks,
+    ChunkingOptions,
     OCRChunkingRequest,
+    OCRUploadRequest,
     OCRChunkingResponse,
     OCRChunk,
     ChunkingRequest,
     ChunkingResponse,
 )
+from app.services import chunk_export
 from app.services.ocr_service import ocr_service
 from app.services.chunking_service import chunk_service
-from typing import Dict, Any
-import asyncio
-from app.utils.webhook_client import send_webhook
+from app.services.dedup_service import dedup_service
+from app.clients.download_client import (
+    DocumentTooLargeError,
+    DownloadedSource,
+    check_declared_size,
+    content_disposition_name,
+    spool_stream,
+)
+from app.services.pipeline_service import NoTextExtractedError, pipeline_service
+from app.services.job_service import job_service
+from app.utils.metrics import stage
+from app.utils.startup import startup
+from app.utils.webhook_client import webhook_dispatcher
+from app.config.settings import settings
+from langchain_core.documents import Document
+from pydantic import BaseModel, ValidationError
+from typing import AsyncIterator, Dict, Any, Literal, Optional
 
 
 router = APIRouter()
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
 
 @router.get("/health-check")
 async def health_check() -> str:
     return "healthy"
 
 
+@router.get("/ready")
+async def ready() -> JSONResponse:
+    """
+    Readiness, separate from the /health-check liveness probe: 503 while the
+    worker is still warming up (heavy imports, default splitter), then 200
+    with its start-up timings.
+    """
+    status = startup.status()
+    return JSONResponse(status, status_code=200 if startup.ready else 503)
+
+
+@router.get("/stats")
+async def stats() -> Dict[str, Any]:
+    return {
+        "ocr_cache": ocr_service.cache.stats(),
+        "ocr_in_flight": ocr_service.flights.in_flight(),
+        "ocr_coalesced": ocr_service.flights.coalesced,
+        "azure_di": ocr_service.client.limiter.stats(),
+        "jobs": await job_service.stats(),
+        "webhooks": webhook_dispatcher.stats(),
+        "dedup": dedup_service.stats(),
+    }
+
+
 @router.post("/ocr")
 async def ocr_only(payload: OCRChunkingRequest) -> OCRChunkingResponse:
     try:
-        docs = ocr_service.process(source=str(payload.url), extra_meta=payload.extra_meta or {})
+        docs = await ocr_service.process(
+            source=str(payload.url),
+            extra_meta=payload.extra_meta or {},
+            cache_mode=payload.cache,
+        )
         if not docs:
             raise HTTPException(status_code=400, detail="No text extracted from the document.")
 
@@ -32,68 +86,264 @@ async def ocr_only(payload: OCRChunkingRequest) -> OCRChunkingResponse:
         chunk_items = [
             OCRChunk(content=d.page_content, metadata=d.metadata) for d in docs
         ]
-        return OCRChunkingResponse( document_id=payload.document_id, chunks=chunk_items )
+        return OCRChunkingResponse(
+            document_id=payload.document_id, chunks=chunk_items, diff=None, duplicates=None
+        )
 
+    except DocumentTooLargeError as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"OCR failed: {exc}")
 
 
 @router.post("/chunking", response_model=ChunkingResponse)  
-async def chunk_text(payload: ChunkingRequest) -> ChunkingResponse:
+async def chunk_text(payload: ChunkingRequest, request: Request) -> ChunkingResponse | Response:
+    base_metadata = payload.base_metadata or {"source": "input_text"}
+    docs = [Document(page_content=payload.text, metadata=base_metadata)]
+    fmt = _export_format(request)
+    if _wants_ndjson(request) and fmt is None:
+        return _ndjson_response(
+            pipeline_service.stream_chunks(
+                payload.document_id,
+                docs,
+                options=payload.chunking,
+                incremental=payload.incremental,
+                dedup=payload.dedup,
+            )
+        )
+
     try:
-        chunks = chunk_service.split_text(
-            text=payload.text,
-            base_metadata=payload.base_metadata or {"source": "input_text"},
+        chunks, diff, duplicates = await pipeline_service.split(
+            payload.document_id, docs, payload.chunking, payload.incremental, payload.dedup
         )
+        if fmt is not None:
+            content = await pipeline_service.export(payload.document_id, chunks, diff, fmt)
+            return Response(content, media_type=chunk_export.media_type(fmt))
         
-        chunk_items = [OCRChunk(content=c.page_content, metadata=c.metadata) for c in chunks]
-        return ChunkingResponse(document_id=payload.document_id, chunks=chunk_items  )
+        with stage("serialize"):
+            chunk_items = [OCRChunk(content=c.text, metadata=c.metadata()) for c in chunks]
+        return ChunkingResponse(
+            document_id=payload.document_id, chunks=chunk_items, diff=diff, duplicates=duplicates
+        )
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Chunking failed: {exc}")
 
 
 @router.post("/ocr-chunking", response_model=OCRChunkingResponse)
-async def ocr_and_chunking(payload: OCRChunkingRequest) -> OCRChunkingResponse:
+async def ocr_and_chunking(payload: OCRChunkingRequest, request: Request) -> OCRChunkingResponse | Response:
     """
     Perform OCR on a remote document and split the extracted text into chunks.
     1. Downloads and extracts text from the document using Azure Document Intelligence.
     2. Splits the extracted text into overlapping chunks for downstream processing.
+
+    With ``Accept: application/x-ndjson`` the chunks are streamed as they are
+    produced, followed by a summary line. ``application/vnd.apache.arrow.stream``
+    and ``application/vnd.apache.parquet`` return the chunks as one columnar table.
     """
+    fmt = _export_format(request)
     try:
-        # Step 1: OCR to obtain a list of LangChain Document objects with metadata
-        docs = ocr_service.process(source=str(payload.url), extra_meta=payload.extra_meta or {})
-        if not docs:
-            raise HTTPException(status_code=400, detail="No text extracted from the document.")
+        if fmt is not None:
+            content = await pipeline_service.ocr_chunking_export(payload, fmt)
+            return Response(content, media_type=chunk_export.media_type(fmt))
+        if _wants_ndjson(request):
+            docs = await pipeline_service.ocr(payload)
+            return _ndjson_response(
+                pipeline_service.stream_chunks(payload.document_id, docs, payload)
+            )
+        return await pipeline_service.ocr_chunking(payload)
 
-        # Step 2: Chunking the documents
-        chunks = chunk_service.split_documents(docs)
+    except Exception as exc:
+        # Known failures map to 4xx, any unexpected error to a 500 response
+        status_code, detail = _pipeline_error(exc)
+        raise HTTPException(status_code=status_code, detail=detail)
 
-        # Step 3: Convert to schema-friendly objects
-        chunk_items = [
-            OCRChunk(content=c.page_content, metadata=c.metadata) for c in chunks
-        ]
 
-        print( payload.document_id )
+@router.post("/ocr-chunking/upload", response_model=OCRChunkingResponse)
+async def ocr_and_chunking_upload(
+    request: Request,
+    document_id: str = Query(..., description="Document id"),
+    file_name: Optional[str] = Query(
+        None, description="File name for the metadata; defaults to the Content-Disposition filename"
+    ),
+    cache: Literal["use", "bypass"] = Query("use", description="'bypass' skips the OCR result cache"),
+    incremental: bool = Query(False, description="Diff against the previous version of this document_id"),
+    dedup: Optional[Literal["off", "tag", "drop"]] = Query(None, description="Duplicate chunk handling"),
+    chunk_size: Optional[int] = Query(None, gt=0, description="Maximum chunk length"),
+    chunk_overlap: Optional[int] = Query(None, ge=0, description="Overlap between consecutive chunks"),
+    length_unit: Optional[Literal["chars", "tokens"]] = Query(None, description="Unit of chunk_size/chunk_overlap"),
+    extra_meta: Optional[str] = Header(None, alias="X-Extra-Meta", description="JSON object of extra metadata"),
+    webhooks: Optional[str] = Header(None, alias="X-Webhooks", description="JSON object of callback URLs"),
+) -> OCRChunkingResponse | Response:
+    """
+    OCR and chunk a document sent as the raw request body (not multipart),
+    e.g. ``curl --data-binary @scan.pdf -H 'Content-Type: application/pdf'``.
 
-        # Fire callbacks asynchronously if provided
-        if payload.webhooks:
-            meta = chunk_items[0].metadata if chunk_items else {}
-            if payload.webhooks.metadata:
-                asyncio.create_task(send_webhook(payload.webhooks.metadata, {"metadata": meta}, payload.webhooks.auth_header))
-            if payload.webhooks.toc:
-                asyncio.create_task(send_webhook(payload.webhooks.toc, {"toc": []}, payload.webhooks.auth_header))
-            if payload.webhooks.section_content:
-                items = [
-                    {"section_id": c.metadata.get("chunk_id"), "content": c.page_content, "metadata": c.metadata}
-                    for c in chunks
-                ]
-                asyncio.create_task(send_webhook(payload.webhooks.section_content, {"sections": items}, payload.webhooks.auth_header))
+    The body is hashed while it is received and spooled to a temporary file
+    past ``download_spool_max_memory``; Azure reads it from that file. Bodies
+    over ``upload_max_bytes`` are rejected with 413. The options of
+    /ocr-chunking are query parameters, and ``extra_meta``/``webhooks`` JSON
+    headers. Responses are negotiated as for /ocr-chunking.
+    """
+    payload = _upload_request(
+        document_id, file_name, cache, incremental, dedup,
+        chunk_size, chunk_overlap, length_unit, extra_meta, webhooks,
+    )
+    fmt = _export_format(request)
+    try:
+        upload = await _receive_upload(request, payload)
+    except DocumentTooLargeError as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+    if not upload.size:
+        upload.close()
+        raise HTTPException(status_code=400, detail="The request body is empty.")
 
-        return OCRChunkingResponse( document_id=payload.document_id, chunks=chunk_items )
+    try:
+        if fmt is not None:
+            content = await pipeline_service.ocr_chunking_export(payload, fmt, upload)
+            return Response(content, media_type=chunk_export.media_type(fmt))
+        if _wants_ndjson(request):
+            docs = await pipeline_service.ocr(payload, upload)
+            return _ndjson_response(
+                pipeline_service.stream_chunks(payload.document_id, docs, payload)
+            )
+        return await pipeline_service.ocr_chunking(payload, upload)
 
     except Exception as exc:
-        # Any unexpected error will be returned as a 500 response
-        raise HTTPException(status_code=500, detail=f"OCR/Chunking failed: {exc}")
+        status_code, detail = _pipeline_error(exc)
+        raise HTTPException(status_code=status_code, detail=detail)
+    finally:
+        # Left to the OCR task once it has claimed the body; removes the spool
+        # file on early failures
+        upload.release()
+
+
+def _upload_request(
+    document_id: str,
+    file_name: Optional[str],
+    cache: Literal["use", "bypass"],
+    incremental: bool,
+    dedup: Optional[Literal["off", "tag", "drop"]],
+    chunk_size: Optional[int],
+    chunk_overlap: Optional[int],
+    length_unit: Optional[Literal["chars", "tokens"]],
+    extra_meta: Optional[str],
+    webhooks: Optional[str],
+) -> OCRUploadRequest:
+    """Validate the upload options taken from the query string and headers (422 if invalid)."""
+    try:
+        chunking = None
+        if chunk_size is not None or chunk_overlap is not None or length_unit is not None:
+            chunking = ChunkingOptions(
+                chunk_size=chunk_size, chunk_overlap=chunk_overlap, separators=None, length_unit=length_unit
+            )
+        return OCRUploadRequest(
+            document_id=document_id,
+            file_name=file_name,
+            cache=cache,
+            incremental=incremental,
+            dedup=dedup,
+            chunking=chunking,
+            extra_meta=json.loads(extra_meta) if extra_meta else None,
+            webhooks=CallbackWebhooks.model_validate_json(webhooks) if webhooks else None,
+        )
+    except ValidationError as exc:
+        raise HTTPException(status_code=422, detail=json.loads(exc.json()))
+    except ValueError as exc:
+        # Headers that are not JSON
+        raise HTTPException(status_code=422, detail=f"Invalid JSON header: {exc}")
+
+
+async def _receive_upload(request: Request, payload: OCRUploadRequest) -> DownloadedSource:
+    max_bytes = settings.upload_max_bytes
+    check_declared_size(request.headers.get("Content-Length"), max_bytes)
+    with stage("upload"):
+        return await spool_stream(
+            request.stream(),
+            max_bytes,
+            file_name=(
+                payload.file_name
+                or content_disposition_name(request.headers.get("Content-Disposition"))
+                or "uploaded_file"
+            ),
+            content_type=request.headers.get("Content-Type"),
+            prefix="ocr-upload-",
+        )
+
+
+@router.post("/ocr-chunking/batch")
+async def ocr_and_chunking_batch(payload: BatchOCRChunkingRequest) -> StreamingResponse:
+    """
+    OCR and chunk many documents concurrently (up to ``batch_max_concurrency``).
+    Streams one NDJSON ``BatchOCRChunkingItem`` per document as soon as it
+    finishes, so results arrive in completion order, not request order.
+    """
+    if len(payload.items) > settings.batch_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch has {len(payload.items)} items, limit is {settings.batch_max_items}.",
+        )
+
+    async def lines() -> AsyncIterator[str]:
+        results = pipeline_service.ocr_chunking_many(payload.items, settings.batch_max_concurrency)
+        async for index, outcome in results:
+            item = payload.items[index]
+            if isinstance(outcome, Exception):
+                status_code, detail = _pipeline_error(outcome)
+                line = BatchOCRChunkingItem(
+                    index=index, document_id=item.document_id, status="failed",
+                    status_code=status_code, error=detail, result=None,
+                )
+            else:
+                line = BatchOCRChunkingItem(
+                    index=index, document_id=item.document_id, status="succeeded",
+                    status_code=200, error=None, result=outcome,
+                )
+            yield line.model_dump_json(exclude_none=True) + "\n"
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
+def _wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _export_format(request: Request) -> Optional[chunk_export.ExportFormat]:
+    """Columnar format asked for in the Accept header, if any (406 without pyarrow)."""
+    accept = request.headers.get("accept", "")
+    if chunk_export.ARROW_STREAM_MEDIA_TYPE in accept:
+        fmt: chunk_export.ExportFormat = "arrow"
+    elif chunk_export.PARQUET_MEDIA_TYPE in accept:
+        fmt = "parquet"
+    else:
+        return None
+    if not chunk_export.available():
+        raise HTTPException(
+            status_code=406, detail="Arrow/Parquet export is not available: pyarrow is not installed."
+        )
+    return fmt
+
+
+def _ndjson_response(records: AsyncIterator[BaseModel]) -> StreamingResponse:
+    async def lines() -> AsyncIterator[str]:
+        async for record in records:
+            yield record.model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
+def _pipeline_error(exc: Exception) -> tuple[int, str]:
+    """Map a pipeline exception to the status code and detail returned to clients."""
+    if isinstance(exc, NoTextExtractedError):
+        return 400, str(exc)
+    if isinstance(exc, DocumentTooLargeError):
+        return 413, str(exc)
+    if isinstance(exc, httpx.HTTPStatusError):
+        # The source URL answered with an error: pass on client errors, 502 for server errors
+        code = exc.response.status_code
+        return (code if 400 <= code < 500 else 502), f"Could not download the document: {exc}"
+    if isinstance(exc, ValidationError):
+        return 422, str(exc)
+    return 500, f"OCR/Chunking failed: {exc}"
     
 
 @router.post("/metadata")
@@ -0,0 +1,42 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+from app.api.schemas.ocr_chunking import OCRChunk
+
+
+class StoredDocument(BaseModel):
+    document_id: str = Field(..., description="Document id")
+    checksum_sha256: Optional[str] = Field(None, description="SHA-256 of the source file, when OCR'd")
+    file_name: Optional[str] = Field(None, description="Source file name, when known")
+    num_sections: int = Field(..., description="Number of stored sections")
+    num_chunks: int = Field(..., description="Number of stored chunks")
+    created_at: float = Field(..., description="First stored (Unix seconds)")
+    updated_at: float = Field(..., description="Last replaced (Unix seconds)")
+
+
+class StoredSection(BaseModel):
+    seq: int = Field(..., description="Position of the section in the document, from 0")
+    page_number: Optional[int] = Field(None, description="Page the section belongs to")
+    section_index: int = Field(..., description="section_index as reported in chunk metadata")
+    section_title: str = Field(..., description="Section heading")
+    char_start: int = Field(..., description="section_char_start in the page text")
+    char_end: int = Field(..., description="section_char_end in the page text")
+    num_chunks: int = Field(..., description="Number of chunks in the section")
+
+
+class DocumentListResponse(BaseModel):
+    documents: List[StoredDocument] = Field(..., description="Stored documents, most recently updated first")
+
+
+class SectionPageResponse(BaseModel):
+    document_id: str = Field(..., description="Document id")
+    total: int = Field(..., description="Number of matching sections")
+    offset: int = Field(..., description="Offset of the first returned section")
+    sections: List[StoredSection] = Field(..., description="Sections in document order")
+
+
+class ChunkPageResponse(BaseModel):
+    document_id: str = Field(..., description="Document id")
+    total: int = Field(..., description="Number of matching chunks")
+    offset: int = Field(..., description="Offset of the first returned chunk")
+    chunks: List[OCRChunk] = Field(..., description="Chunks in document order, as originally returned")
@@ -0,0 +1,24 @@
+from typing import Literal, Optional
+from pydantic import BaseModel, Field
+
+from app.api.schemas.ocr_chunking import OCRChunkingResponse
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+
+class JobSubmitResponse(BaseModel):
+    job_id: str = Field(..., description="Job id to poll with GET /jobs/{job_id}")
+    status: JobStatus = Field(..., description="Current job status")
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str = Field(..., description="Job id")
+    document_id: str = Field(..., description="Document id from the submitted request")
+    status: JobStatus = Field(..., description="Current job status")
+    attempts: int = Field(..., description="Number of times a worker picked up the job")
+    created_at: float = Field(..., description="Submission time (Unix seconds)")
+    updated_at: float = Field(..., description="Last status change (Unix seconds)")
+    error: Optional[str] = Field(None, description="Failure reason when status is 'failed'")
+    result: Optional[OCRChunkingResponse] = Field(
+        None, description="OCR-chunking result when status is 'succeeded'"
+    )
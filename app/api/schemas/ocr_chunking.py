@@ -1,40 +1,132 @@
-from typing import Any, Dict, List, Optional
-from pydantic import BaseModel, HttpUrl, Field
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, HttpUrl, Field, model_validator
+from app.config.settings import settings
 
 class CallbackWebhooks(BaseModel):
     """URLs to be called back after processing is finished."""
-    metadata: Optional[str] = Field(
+    metadata: Optional[HttpUrl] = Field(
         None, description="Webhook to update document metadata"
     )
-    toc: Optional[str] = Field(
+    toc: Optional[HttpUrl] = Field(
         None, description="Webhook to update table of contents"
     )
-    section_content: Optional[str] = Field(
+    section_content: Optional[HttpUrl] = Field(
         None, description="Webhook to store each section/chunk content"
     )
     auth_header: Optional[str] = Field(
         None, description="Optional Authorization header to include when calling"
     )
 
-class OCRChunkingRequest(BaseModel):
+class ChunkingOptions(BaseModel):
+    """Per-request splitter settings; unset fields fall back to the service defaults."""
+    chunk_size: Optional[int] = Field(None, gt=0, description="Maximum chunk length")
+    chunk_overlap: Optional[int] = Field(None, ge=0, description="Overlap between consecutive chunks")
+    separators: Optional[List[str]] = Field(
+        None, min_length=1, description="Separators tried in order, as plain strings"
+    )
+    length_unit: Optional[Literal["chars", "tokens"]] = Field(
+        None, description="Measure chunk_size/chunk_overlap in characters or tokenizer tokens"
+    )
+
+    @model_validator(mode="after")
+    def check_overlap(self) -> "ChunkingOptions":
+        size = self.chunk_size if self.chunk_size is not None else settings.chunk_size
+        overlap = self.chunk_overlap if self.chunk_overlap is not None else settings.chunk_overlap
+        if overlap > size:
+            raise ValueError(f"chunk_overlap ({overlap}) must not exceed chunk_size ({size})")
+        if self.length_unit == "tokens" and not settings.chunk_tokenizer_path:
+            raise ValueError("token-budget chunking is not available: no tokenizer is configured")
+        return self
+
+class _OCRChunkingOptions(BaseModel):
+    """Options shared by /ocr-chunking and /ocr-chunking/upload."""
     document_id: str = Field(..., description="Document id")
-    url: HttpUrl = Field(..., description="Public URL of the document (PDF, image, etc.)")
     extra_meta: Optional[Dict[str, Any]] = Field(
         default=None, description="Optional additional metadata"
     )
     webhooks: Optional[CallbackWebhooks] = Field(
         None, description="Callback URLs to notify after processing"
     )
+    cache: Literal["use", "bypass"] = Field(
+        "use", description="Set to 'bypass' to skip the OCR result cache and re-run Azure DI"
+    )
+    chunking: Optional[ChunkingOptions] = Field(
+        None, description="Optional chunk size/overlap/separators for this request"
+    )
+    incremental: bool = Field(
+        False,
+        description="Diff against the previous version of this document_id and only re-split changed sections",
+    )
+    dedup: Optional[Literal["off", "tag", "drop"]] = Field(
+        None,
+        description="Flag ('tag') or omit ('drop') chunks already indexed for another document; defaults to the service setting",
+    )
+
+class OCRChunkingRequest(_OCRChunkingOptions):
+    url: HttpUrl = Field(..., description="Public URL of the document (PDF, image, etc.)")
+
+class OCRUploadRequest(_OCRChunkingOptions):
+    """Options of /ocr-chunking/upload, where the document is the request body instead of a URL."""
+    file_name: Optional[str] = Field(None, description="File name recorded in the chunk metadata")
+
+class ChunkDiff(BaseModel):
+    """Chunks of this version compared with the previous version of the same document_id."""
+    version: int = Field(..., description="Version number of this ingest (1 for the first)")
+    added: List[str] = Field(..., description="chunk_ids with new content, to (re-)embed")
+    removed: List[str] = Field(..., description="Previous chunk_ids whose content is gone")
+    unchanged: List[str] = Field(..., description="chunk_ids whose content is unchanged")
+    moved: Dict[str, str] = Field(
+        ..., description="Previous chunk_id -> chunk_id for unchanged chunks that were renumbered"
+    )
+    sections_reused: int = Field(..., description="Sections taken over without re-splitting")
+    sections_split: int = Field(..., description="New or changed sections that were split")
 
 class OCRChunk(BaseModel):
     content: str = Field(..., description="Text content of the chunk")
     metadata: Dict[str, Any] = Field(..., description="Associated metadata for the chunk")
 
+class OCRChunkRecord(OCRChunk):
+    """NDJSON chunk line; ``num_chunks`` is reported in the trailing summary instead."""
+    type: Literal["chunk"] = "chunk"
+
+class ChunkStreamSummary(BaseModel):
+    """Last NDJSON line of a streamed chunking response."""
+    type: Literal["summary"] = "summary"
+    document_id: str = Field(..., description="Document id")
+    num_chunks: int = Field(..., description="Total number of chunks streamed")
+    num_chunks_by_source: Dict[str, int] = Field(
+        ..., description="Chunk count per metadata 'source' (the num_chunks of each chunk)"
+    )
+    diff: Optional[ChunkDiff] = Field(None, description="Set for incremental requests")
+    duplicates: Optional[Dict[str, str]] = Field(
+        None, description="chunk_id -> canonical chunk_id of duplicates, when dedup is enabled"
+    )
+
 class OCRChunkingResponse(BaseModel):
     document_id: str = Field(..., description="Document id")
     chunks: List[OCRChunk] = Field(
         ..., description="List of chunks after OCR and text splitting"
     )
+    diff: Optional[ChunkDiff] = Field(None, description="Set for incremental requests")
+    duplicates: Optional[Dict[str, str]] = Field(
+        None, description="chunk_id -> canonical chunk_id of duplicates, when dedup is enabled"
+    )
+
+class BatchOCRChunkingRequest(BaseModel):
+    items: List[OCRChunkingRequest] = Field(
+        ..., min_length=1, description="Documents to OCR and chunk concurrently"
+    )
+
+class BatchOCRChunkingItem(BaseModel):
+    """One NDJSON line of the batch response, emitted as soon as the item finishes."""
+    index: int = Field(..., description="Position of the item in the request")
+    document_id: str = Field(..., description="Document id")
+    status: Literal["succeeded", "failed"] = Field(..., description="Item outcome")
+    status_code: int = Field(..., description="HTTP status the single-item endpoint would return")
+    error: Optional[str] = Field(None, description="Failure reason when status is 'failed'")
+    result: Optional[OCRChunkingResponse] = Field(
+        None, description="OCR-chunking result when status is 'succeeded'"
+    )
 
 class ChunkingRequest(BaseModel):
     document_id: str = Field(..., description="Document id")
@@ -46,9 +138,24 @@ class ChunkingRequest(BaseModel):
         default=None,
         description="Optional metadata to attach to each resulting chunk",
     )
+    chunking: Optional[ChunkingOptions] = Field(
+        None, description="Optional chunk size/overlap/separators for this request"
+    )
+    incremental: bool = Field(
+        False,
+        description="Diff against the previous version of this document_id and only re-split changed sections",
+    )
+    dedup: Optional[Literal["off", "tag", "drop"]] = Field(
+        None,
+        description="Flag ('tag') or omit ('drop') chunks already indexed for another document; defaults to the service setting",
+    )
 
 class ChunkingResponse(BaseModel):
     document_id: str = Field(..., description="Document id")
     chunks: List[OCRChunk] = Field(
         ..., description="List of text chunks with metadata after splitting"
+    )
+    diff: Optional[ChunkDiff] = Field(None, description="Set for incremental requests")
+    duplicates: Optional[Dict[str, str]] = Field(
+        None, description="chunk_id -> canonical chunk_id of duplicates, when dedup is enabled"
     )
\ No newline at end of file
@@ -1,9 +1,25 @@
-from typing import List, Optional, Union, Iterable
-from langchain_community.document_loaders.doc_intelligence import AzureAIDocumentIntelligenceLoader
+import asyncio
+import io
+import mmap
+import os
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import IO, TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Union, Iterable
 from langchain_core.documents import Document
 from app.config.settings import settings
+from app.utils.adaptive_limiter import AdaptiveLimiter
+from app.utils.layout import layout_paragraphs
+from app.utils.metrics import AZURE_RETRIES
+from app.utils.pdf_pages import count_pdf_pages
 from pathlib import Path
 
+# The Azure SDK and the LangChain loader are imported on first use, keeping
+# them out of the service's import (and worker boot) time
+if TYPE_CHECKING:
+    from azure.ai.documentintelligence.aio import DocumentIntelligenceClient
+    from langchain_community.document_loaders.doc_intelligence import AzureAIDocumentIntelligenceLoader
+
 class AzureDIClient:
     """Wrapper for LangChain Azure Document Intelligence loader."""
 
@@ -28,7 +44,9 @@ class AzureDIClient:
             docs.extend(self.load(s))
         return docs
 
-    def _make_loader(self, source: Union[str, bytes]) -> AzureAIDocumentIntelligenceLoader:
+    def _make_loader(self, source: Union[str, bytes]) -> "AzureAIDocumentIntelligenceLoader":
+        from langchain_community.document_loaders.doc_intelligence import AzureAIDocumentIntelligenceLoader
+
         cfg = dict(
             api_endpoint=settings.azure_di_endpoint,
             api_key=settings.azure_di_api_key,
@@ -42,7 +60,262 @@ class AzureDIClient:
         else:
             cfg["file_path"] = str(source)
         return AzureAIDocumentIntelligenceLoader(**cfg)
-    
+
+
+class AsyncAzureDIClient:
+    """
+    Non-blocking Azure Document Intelligence client built on the SDK aio client.
+
+    Produces the same Documents as the LangChain loader used by AzureDIClient,
+    but the analyze request and the long-running-operation polling are awaited
+    on the event loop instead of blocking it.
+    """
+
+    def __init__(self, limiter: Optional[AdaptiveLimiter] = None) -> None:
+        self._client: Optional["DocumentIntelligenceClient"] = None
+        self.limiter = limiter or azure_di_limiter
+
+    @property
+    def client(self) -> "DocumentIntelligenceClient":
+        if self._client is None:
+            if settings.azure_di_api_key is None:
+                raise ValueError("azure_di_api_key must be set to call Azure Document Intelligence.")
+            from azure.ai.documentintelligence.aio import DocumentIntelligenceClient
+            from azure.core.credentials import AzureKeyCredential
+
+            # SDK retries are disabled so throttling reaches the shared limiter
+            self._client = DocumentIntelligenceClient(
+                endpoint=settings.azure_di_endpoint,
+                credential=AzureKeyCredential(settings.azure_di_api_key),
+                retry_total=0,
+            )
+        return self._client
+
+    async def load(self, source: Union[str, bytes, IO[bytes]]) -> List[Document]:
+        """Analyze a single file path/URL, bytes or binary stream into LangChain Documents."""
+        ranges = await self._page_ranges(source)
+        if not ranges:
+            result = await self._analyze_with_retries(source)
+            return list(_results_to_documents([result], settings.azure_di_mode, self.layout))
+
+        # Large PDF: analyze page ranges concurrently, then merge in page order
+        sem = asyncio.Semaphore(settings.azure_di_max_parallel_ranges)
+
+        async def run(pages: str) -> Any:
+            async with sem:
+                return await self._analyze_with_retries(source, pages)
+
+        results = await asyncio.gather(*(run(pages) for pages in ranges))
+        return list(_results_to_documents(results, settings.azure_di_mode, self.layout))
+
+    @property
+    def layout(self) -> bool:
+        return settings.azure_di_sectioning == "layout"
+
+    async def load_many(self, sources: Iterable[Union[str, bytes]]) -> List[Document]:
+        """Analyze several sources concurrently; the shared limiter caps Azure load."""
+        results = await asyncio.gather(*(self.load(s) for s in sources))
+        return [d for docs in results for d in docs]
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    async def _analyze_with_retries(
+        self,
+        source: Union[str, bytes, IO[bytes]],
+        pages: Optional[str] = None,
+    ) -> Any:
+        max_retries = settings.azure_di_max_retries
+        attempt = 0
+        while True:
+            attempt += 1
+            async with self.limiter.slot():
+                try:
+                    if not isinstance(source, (str, bytes)):
+                        source.seek(0)
+                    result = await self._analyze(source, pages)
+                    self.limiter.on_success()
+                    return result
+                except Exception as exc:
+                    retry_after = _retry_after(exc)
+                    if _is_throttle(exc):
+                        self.limiter.on_throttle(retry_after)
+                    if attempt == max_retries or not _is_retryable(exc):
+                        raise
+                    AZURE_RETRIES.labels(_retry_reason(exc)).inc()
+            # Back off outside the slot so other analyses can use it meanwhile
+            await asyncio.sleep(retry_after or _backoff_delay(attempt))
+
+    async def _analyze(
+        self,
+        source: Union[str, bytes, IO[bytes]],
+        pages: Optional[str] = None,
+    ) -> Any:
+        mode = settings.azure_di_mode
+        kwargs: Dict[str, Any] = dict(
+            pages=pages,
+            output_content_format="markdown" if mode == "markdown" else "text",
+            # Offsets as Python string indexes, for layout sectioning
+            string_index_type="unicodeCodePoint",
+        )
+        if isinstance(source, str) and source.startswith(("http://", "https://")):
+            from azure.ai.documentintelligence.models import AnalyzeDocumentRequest
+
+            body: Any = AnalyzeDocumentRequest(url_source=source)
+            poller = await self.client.begin_analyze_document(
+                settings.azure_di_api_model, body=body, **kwargs
+            )
+            return await poller.result()
+
+        # Raw bytes and files are uploaded as-is, no base64 JSON. Each call
+        # opens its own handle so page ranges can upload concurrently.
+        kwargs["content_type"] = "application/octet-stream"
+        if isinstance(source, str):
+            with open(source, "rb") as f:
+                poller = await self.client.begin_analyze_document(
+                    settings.azure_di_api_model, body=f, **kwargs
+                )
+        else:
+            stream = io.BytesIO(source) if isinstance(source, bytes) else source
+            poller = await self.client.begin_analyze_document(
+                settings.azure_di_api_model, body=stream, **kwargs
+            )
+        return await poller.result()
+
+    async def _page_ranges(self, source: Union[str, bytes, IO[bytes]]) -> List[str]:
+        """Return DI ``pages`` ranges when the source is a PDF worth splitting."""
+        size = settings.azure_di_page_range_size
+        if size <= 0 or not isinstance(source, (str, bytes)):
+            return []
+        if isinstance(source, str) and source.startswith(("http://", "https://")):
+            return []
+        page_count = await asyncio.to_thread(_count_source_pages, source)
+        if not page_count or page_count <= size:
+            return []
+        return [
+            f"{start}-{min(start + size - 1, page_count)}"
+            for start in range(1, page_count + 1, size)
+        ]
+
+
+_RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+_THROTTLE_STATUS = {429, 503}
+_RETRYABLE_CODES = {"InternalServerError", "ServiceUnavailable", "Timeout", "TooManyRequests"}
+
+
+def _status(exc: Exception) -> Optional[int]:
+    from azure.core.exceptions import HttpResponseError
+
+    return getattr(exc, "status_code", None) if isinstance(exc, HttpResponseError) else None
+
+
+def _is_throttle(exc: Exception) -> bool:
+    return _status(exc) in _THROTTLE_STATUS
+
+
+def _retry_reason(exc: Exception) -> str:
+    return "throttled" if _is_throttle(exc) else "transient"
+
+
+def _is_retryable(exc: Exception) -> bool:
+    """Only transient failures are retried; bad input or auth errors fail fast."""
+    from azure.core.exceptions import HttpResponseError, ServiceRequestError, ServiceResponseError
+
+    if isinstance(exc, (ServiceRequestError, ServiceResponseError, asyncio.TimeoutError)):
+        return True
+    if isinstance(exc, HttpResponseError):
+        if exc.status_code in _RETRYABLE_STATUS:
+            return True
+        # A failed long-running operation reports the cause as an error code
+        code = exc.error.code if exc.error is not None else None
+        return code in _RETRYABLE_CODES
+    return False
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    """Seconds requested by the service through Retry-After headers, if any."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    for name, scale in (("retry-after-ms", 1000.0), ("x-ms-retry-after-ms", 1000.0)):
+        value = headers.get(name)
+        if value:
+            try:
+                return float(value) / scale
+            except ValueError:
+                pass
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(str(value)).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter."""
+    cap = min(settings.azure_di_backoff_max, settings.azure_di_backoff_base * 2 ** (attempt - 1))
+    return random.uniform(0, cap)
+
+
+def _count_source_pages(source: Union[str, bytes]) -> Optional[int]:
+    if isinstance(source, bytes):
+        return count_pdf_pages(source)
+    with open(source, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            return count_pdf_pages(m)
+
+
+def _results_to_documents(results: List[Any], mode: str, layout: bool = False) -> Iterator[Document]:
+    """
+    Convert AnalyzeResults the same way the LangChain parser does.
+
+    Several results come from page-range analyses of one document; they are
+    merged back into a single document (or one document per page) in page order.
+    With ``layout``, single/markdown documents also carry their heading and
+    page furniture paragraphs under the ``layout`` metadata key.
+    """
+    if mode in ["single", "markdown"]:
+        if len(results) == 1:
+            metadata = results[0].as_dict()
+            if layout:
+                metadata["layout"] = layout_paragraphs(results[0])
+            yield Document(page_content=results[0].content, metadata=metadata)
+            return
+        sep = "\n<!-- PageBreak -->\n" if mode == "markdown" else "\n"
+        metadata = {}
+        if layout:
+            paragraphs = []
+            shift = 0
+            for r in results:
+                paragraphs.extend(layout_paragraphs(r, shift))
+                shift += len(r.content) + len(sep)
+            metadata["layout"] = paragraphs
+        yield Document(page_content=sep.join(r.content for r in results), metadata=metadata)
+    elif mode in ["page"]:
+        pages = sorted((p for r in results for p in r.pages), key=lambda p: p.page_number)
+        for p in pages:
+            content = " ".join([line.content for line in p.lines or []])
+            yield Document(page_content=content, metadata={"page": p.page_number})
+    else:
+        raise ValueError(f"Invalid mode: {mode}")
+
+
+azure_di_limiter = AdaptiveLimiter(
+    max_limit=settings.azure_di_max_concurrency,
+    min_limit=settings.azure_di_min_concurrency,
+)
+
 
 if __name__ == "__main__":
     # Initialize client
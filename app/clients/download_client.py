@@ -0,0 +1,178 @@
+import hashlib
+import re
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, AsyncIterator, Optional, Union
+from urllib.parse import unquote, urlparse
+
+import httpx
+
+from app.config.settings import settings
+
+
+class DocumentTooLargeError(ValueError):
+    """Raised when a source document exceeds ``download_max_bytes``."""
+
+
+@dataclass
+class DownloadedSource:
+    """
+    A source document fetched once, hashed while streaming and ready to upload.
+
+    Exactly one of ``data`` (small documents kept in memory) or ``path``
+    (spooled or local file on disk) is set.
+    """
+
+    checksum_sha256: str
+    file_name: str
+    content_type: Optional[str]
+    size: int
+    data: Optional[bytes] = None
+    path: Optional[str] = None
+    _spool: Optional[IO[bytes]] = field(default=None, repr=False)
+    _claimed: bool = field(default=False, repr=False)
+
+    @property
+    def source(self) -> Union[str, bytes]:
+        """The value to hand to the Azure DI client: bytes or a file path."""
+        return self.data if self.data is not None else str(self.path)
+
+    def close(self) -> None:
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+
+    def claim(self) -> None:
+        """Hand the spool to the task analyzing it, which closes it when done."""
+        self._claimed = True
+
+    def release(self) -> None:
+        """Close the spool unless a task has claimed it."""
+        if not self._claimed:
+            self.close()
+
+
+class DownloadClient:
+    """
+    Stream a remote document into a bounded spool.
+
+    Small files stay in memory, larger ones roll over to a temporary file.
+    The SHA-256, size, file name and content type are all taken from the
+    same single pass, so the document is never fetched twice.
+    """
+
+    def __init__(self) -> None:
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                follow_redirects=True,
+                timeout=settings.download_timeout,
+            )
+        return self._client
+
+    async def fetch(self, url: str) -> DownloadedSource:
+        max_bytes = settings.download_max_bytes
+        async with self.client.stream("GET", url) as r:
+            r.raise_for_status()
+            check_declared_size(r.headers.get("Content-Length"), max_bytes)
+            return await spool_stream(
+                r.aiter_bytes(chunk_size=64 * 1024),
+                max_bytes,
+                file_name=(
+                    content_disposition_name(r.headers.get("Content-Disposition"))
+                    or guess_file_name(url)
+                ),
+                content_type=r.headers.get("Content-Type"),
+            )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def check_declared_size(length: Optional[str], max_bytes: int) -> None:
+    """Reject a body up front when its Content-Length is over the limit."""
+    if length and length.isdigit() and int(length) > max_bytes:
+        raise DocumentTooLargeError(f"Document is {length} bytes, limit is {max_bytes} bytes.")
+
+
+async def spool_stream(
+    chunks: AsyncIterator[bytes],
+    max_bytes: int,
+    file_name: str,
+    content_type: Optional[str] = None,
+    prefix: str = "ocr-download-",
+) -> DownloadedSource:
+    """
+    Consume a byte stream into a DownloadedSource, hashing it as it arrives.
+
+    Up to ``download_spool_max_memory`` bytes stay in memory; past that the
+    stream rolls over to a temporary file, removed when the source is closed.
+    Raises DocumentTooLargeError as soon as ``max_bytes`` is exceeded.
+    """
+    max_memory = settings.download_spool_max_memory
+    h = hashlib.sha256()
+    size = 0
+    buf = bytearray()
+    spool: Optional[IO[bytes]] = None
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_bytes:
+                raise DocumentTooLargeError(
+                    f"Document exceeds the {max_bytes} bytes limit."
+                )
+            h.update(chunk)
+            if spool is None and size > max_memory:
+                # Roll over to disk; the file is removed when closed
+                spool = tempfile.NamedTemporaryFile(prefix=prefix)
+                spool.write(buf)
+                buf = bytearray()
+            if spool is not None:
+                spool.write(chunk)
+            else:
+                buf += chunk
+    except BaseException:
+        if spool is not None:
+            spool.close()
+        raise
+
+    fetched = DownloadedSource(
+        checksum_sha256=h.hexdigest(),
+        file_name=file_name,
+        content_type=content_type.split(";")[0].strip() if content_type else None,
+        size=size,
+    )
+    if spool is not None:
+        spool.flush()
+        fetched.path = spool.name
+        fetched._spool = spool
+    else:
+        fetched.data = bytes(buf)
+    return fetched
+
+
+def guess_file_name(source: Union[str, bytes]) -> str:
+    if isinstance(source, bytes):
+        return "uploaded_bytes"
+    if source.startswith(("http://", "https://")):
+        return Path(urlparse(source).path).name or "downloaded_file"
+    return Path(source).name
+
+
+_FILENAME_STAR = re.compile(r"filename\*\s*=\s*[^']*'[^']*'([^;]+)", re.IGNORECASE)
+_FILENAME = re.compile(r'filename\s*=\s*"?([^";]+)"?', re.IGNORECASE)
+
+
+def content_disposition_name(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    m = _FILENAME_STAR.search(value) or _FILENAME.search(value)
+    if not m:
+        return None
+    return Path(unquote(m.group(1).strip())).name or None
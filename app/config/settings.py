@@ -1,3 +1,4 @@
+from pydantic import Field
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -9,11 +10,100 @@ class Settings(BaseSettings):
     azure_di_api_key: str | None = None
     azure_di_api_model: str = "prebuilt-layout"
     azure_di_mode: str = "markdown"
-    azure_di_max_retries: int = 3
+    # Attempts per analysis, the first one included
+    azure_di_max_retries: int = Field(default=3, ge=1)
+    # Split PDFs longer than this many pages into concurrently analyzed ranges (0 = off)
+    azure_di_page_range_size: int = 0
+    azure_di_max_parallel_ranges: int = 4
+    # Process-wide cap on in-flight analyses, adapted AIMD-style on 429/503
+    azure_di_max_concurrency: int = 16
+    azure_di_min_concurrency: int = 1
+    azure_di_backoff_base: float = 1.0
+    azure_di_backoff_max: float = 30.0
+    # "regex" re-detects headings in the text; "layout" takes them from DI paragraph
+    # roles and drops page headers/footers (single/markdown modes only)
+    azure_di_sectioning: str = "regex"
+
+    # --- Source download ---
+    download_max_bytes: int = 500 * 1024 * 1024
+    download_spool_max_memory: int = 16 * 1024 * 1024
+    download_timeout: float = 60.0
+    # Raw-body uploads to /ocr-chunking/upload (spooled like downloads)
+    upload_max_bytes: int = 500 * 1024 * 1024
+
+    # --- OCR result cache ---
+    ocr_cache_enabled: bool = True
+    ocr_cache_path: str = ".cache/ocr_cache.sqlite3"
+    ocr_cache_memory_items: int = 64
+    ocr_cache_max_bytes: int = 1024 * 1024 * 1024
+    ocr_cache_ttl_seconds: int = 30 * 24 * 3600
+
+    # --- Job queue ---
+    job_db_path: str = ".cache/jobs.sqlite3"
+    job_workers: int = 4
+    job_queue_max_size: int = 1000
+    job_lease_seconds: int = 60
+    job_max_attempts: int = 3
+    job_retention_seconds: int = 7 * 24 * 3600
+    job_retry_after_seconds: int = 30
+
+    # --- Batch endpoint ---
+    batch_max_items: int = 1000
+    batch_max_concurrency: int = 8
+
+    # --- Webhooks ---
+    webhook_workers: int = 4
+    webhook_queue_size: int = 10000
+    webhook_max_attempts: int = 5
+    webhook_timeout: float = 10.0
+    webhook_max_connections_per_host: int = 8
+    webhook_gzip: bool = False
+    webhook_gzip_min_bytes: int = 16 * 1024
+    # Page section_content payloads into batches of this many chunks (0 = one payload)
+    webhook_sections_batch_size: int = 0
+    webhook_drain_timeout: float = 30.0
+
+    # --- Incremental re-chunking ---
+    revision_db_path: str = ".cache/revisions.sqlite3"
+
+    # --- Duplicate chunk detection ---
+    dedup_mode: str = "off"  # "off", "tag" or "drop"
+    dedup_db_path: str = ".cache/dedup.sqlite3"
+    dedup_near_duplicates: bool = True
+    # SimHash bits that may differ for a near duplicate (at most 15)
+    dedup_simhash_max_distance: int = 4
+
+    # --- Observability ---
+    # /metrics aggregates all uvicorn workers when PROMETHEUS_MULTIPROC_DIR is set
+    # Expose the /debug/profiler endpoints (sampling profiler switched on at runtime)
+    profiler_enabled: bool = False
+    profiler_max_seconds: float = 300.0
+
+    # --- Chunk store ---
+    # Keep returned chunks in SQLite for the /documents read endpoints
+    chunk_store_enabled: bool = True
+    chunk_store_path: str = ".cache/chunks.sqlite3"
+    chunk_store_page_max: int = 1000
+    # Documents not re-ingested within the TTL, then the least recently written ones, are dropped
+    chunk_store_max_documents: int = 100_000
+    chunk_store_ttl_seconds: int = 90 * 24 * 3600
+
+    # --- Chunking process pool ---
+    # Inputs of at least this many characters are chunked in worker processes (0 = never)
+    chunk_pool_min_chars: int = 256 * 1024
+    chunk_pool_workers: int = 0  # 0 = os.cpu_count()
 
     # --- Chunking Service ---
     chunk_size: int = 1000
     chunk_overlap: int = 200
     chunk_separators: list[str] | None = None
+    # Splitters for per-request chunking options, kept in an LRU of this size
+    chunk_splitter_cache_size: int = 32
+    # "chars" or "tokens"; token budgets are counted with the local tokenizer below
+    chunk_length_unit: str = "chars"
+    # WordPiece vocab.txt, or a Hugging Face tokenizer.json (needs the tokenizers extra)
+    chunk_tokenizer_path: str | None = None
+    chunk_tokenizer_lowercase: bool = False
+    chunk_token_cache_size: int = 8192
 
 settings = Settings()
\ No newline at end of file
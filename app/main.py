@@ -1,10 +1,49 @@
-import uvicorn
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+# Imported first: start-up timing begins here
+from app.utils.startup import startup
+
 from fastapi import FastAPI
-from app.api.routers.v1 import ocr_chunking
+from app.api.routers.v1 import documents, jobs, observability, ocr_chunking
+from app.services.chunk_pool import chunk_pool
+from app.services.job_service import job_service
+from app.services.ocr_service import ocr_service
+from app.utils.metrics import MetricsMiddleware, mark_process_dead
+from app.utils.sampling_profiler import profiler
+from app.utils.webhook_client import webhook_dispatcher
 
 from app.config.settings import settings
 
-app = FastAPI(title="OCR Chunking Microservice")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    with startup.phase("lifespan"):
+        webhook_dispatcher.start()
+        await job_service.start()
+    # Serve /health-check right away; /ready reports 200 once warm
+    warming = asyncio.create_task(_warm_up())
+    yield
+    warming.cancel()
+    await job_service.stop()
+    # Deliver callbacks that were already accepted
+    await webhook_dispatcher.drain(settings.webhook_drain_timeout)
+    # Release the pooled Azure DI connections
+    await ocr_service.close()
+    chunk_pool.shutdown()
+    profiler.stop()
+    mark_process_dead(os.getpid())
+
+
+async def _warm_up() -> None:
+    await asyncio.to_thread(startup.warm_up)
+    startup.mark_ready()
+
+
+app = FastAPI(title="OCR Chunking Microservice", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(
     ocr_chunking.router,
@@ -12,5 +51,27 @@ app.include_router(
     tags=["OCR Chunking"]
 )
 
+app.include_router(
+    jobs.router,
+    prefix="/api/v1",
+    tags=["Jobs"]
+)
+
+app.include_router(
+    documents.router,
+    prefix="/api/v1",
+    tags=["Documents"]
+)
+
+app.include_router(
+    observability.router,
+    prefix="/api/v1",
+    tags=["Observability"]
+)
+
+startup.imported()
+
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=settings.debug)
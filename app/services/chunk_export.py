@@ -0,0 +1,146 @@
+import io
+import json
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, List, Literal, Optional, Sequence, Union
+
+from app.api.schemas.ocr_chunking import ChunkDiff
+from app.services.chunk_spans import ChunkSpan
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+ExportFormat = Literal["arrow", "parquet"]
+
+# Per-chunk columns; every other metadata key is document-level (shared by
+# all chunks of a page) and becomes a dictionary-encoded column
+CHUNK_COLUMNS = (
+    "chunk_id",
+    "chunk_index",
+    "num_chunks",
+    "start_index",
+    "end_index",
+    "section_title",
+    "section_index",
+    "section_char_start",
+    "section_char_end",
+    "duplicate_of",
+    "duplicate_of_document",
+    "duplicate_kind",
+)
+
+
+def _pyarrow() -> Any:
+    try:
+        import pyarrow
+    except ImportError as exc:
+        raise RuntimeError(
+            "Arrow/Parquet export needs the optional 'pyarrow' package: "
+            "pip install 'ocr-chunking[arrow]'"
+        ) from exc
+    return pyarrow
+
+
+def available() -> bool:
+    try:
+        _pyarrow()
+    except RuntimeError:
+        return False
+    return True
+
+
+def chunk_table(
+    document_id: str,
+    chunks: Sequence[ChunkSpan],
+    diff: Optional[ChunkDiff] = None,
+) -> "pa.Table":
+    """
+    One row per chunk: content, offsets and section columns, plus one
+    dictionary-encoded column per document-level metadata key. Values are
+    collected once per page rather than once per chunk. ``diff`` is kept
+    as JSON in the schema metadata.
+    """
+    pa = _pyarrow()
+    pages: Dict[int, int] = {}
+    page_metadata: List[Dict[str, Any]] = []
+    rows: List[int] = []
+    for c in chunks:
+        source = c.section.source
+        page = pages.get(id(source))
+        if page is None:
+            page = pages[id(source)] = len(page_metadata)
+            page_metadata.append(source.metadata)
+        rows.append(page)
+    row_pages = pa.array(rows, type=pa.int32())
+
+    duplicates = [c.duplicate_of or (None, None, None) for c in chunks]
+    columns: Dict[str, Any] = {
+        "document_id": pa.DictionaryArray.from_arrays(
+            pa.array([0] * len(chunks), type=pa.int32()), pa.array([document_id])
+        ),
+        "chunk_id": pa.array([c.chunk_id for c in chunks], type=pa.string()),
+        "content": pa.array([c.text for c in chunks], type=pa.large_string()),
+        "chunk_index": pa.array([c.chunk_index for c in chunks], type=pa.int32()),
+        "num_chunks": pa.array([c.num_chunks for c in chunks], type=pa.int32()),
+        "start_index": pa.array([c.start_index for c in chunks], type=pa.int64()),
+        "end_index": pa.array([c.start_index + c.length for c in chunks], type=pa.int64()),
+        "section_title": pa.array([c.section.title for c in chunks], type=pa.string()).dictionary_encode(),
+        "section_index": pa.array([c.section.index for c in chunks], type=pa.int32()),
+        "section_char_start": pa.array([c.section.char_start for c in chunks], type=pa.int64()),
+        "section_char_end": pa.array([c.section.char_end for c in chunks], type=pa.int64()),
+        "duplicate_of": pa.array([d[0] for d in duplicates], type=pa.string()),
+        "duplicate_of_document": pa.array([d[1] for d in duplicates], type=pa.string()),
+        "duplicate_kind": pa.array([d[2] for d in duplicates], type=pa.string()).dictionary_encode(),
+    }
+
+    keys: Dict[str, None] = {}
+    for meta in page_metadata:
+        keys.update((k, None) for k in meta if k not in CHUNK_COLUMNS and k not in columns)
+    for key in keys:
+        columns[key] = _page_column(pa, [meta.get(key) for meta in page_metadata], row_pages)
+
+    table = pa.table(columns)
+    if diff is not None:
+        table = table.replace_schema_metadata({"diff": diff.model_dump_json()})
+    return table
+
+
+def _page_column(pa: Any, values: List[Any], row_pages: Any) -> Any:
+    """Spread per-page values over the chunk rows; strings stay dictionary-encoded."""
+    try:
+        per_page = pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed or nested values that Arrow cannot type: keep them as JSON
+        per_page = pa.array(
+            [None if v is None else json.dumps(v, ensure_ascii=False, default=str) for v in values],
+            type=pa.string(),
+        )
+    if pa.types.is_null(per_page.type):
+        per_page = per_page.cast(pa.string())
+    if pa.types.is_string(per_page.type):
+        encoded = per_page.dictionary_encode()
+        return pa.DictionaryArray.from_arrays(encoded.indices.take(row_pages), encoded.dictionary)
+    return per_page.take(row_pages)
+
+
+def write_table(table: "pa.Table", fmt: ExportFormat, sink: Union[str, BinaryIO]) -> None:
+    """Write an Arrow IPC stream or a Parquet file to a path or binary file."""
+    pa = _pyarrow()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, sink, compression="zstd")
+        return
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def encode_table(table: "pa.Table", fmt: ExportFormat) -> bytes:
+    sink = io.BytesIO()
+    write_table(table, fmt, sink)
+    return sink.getvalue()
+
+
+def media_type(fmt: ExportFormat) -> str:
+    return PARQUET_MEDIA_TYPE if fmt == "parquet" else ARROW_STREAM_MEDIA_TYPE
@@ -0,0 +1,178 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+from app.config.settings import settings
+from app.services.chunk_spans import chunk_offsets, section_ranges
+from app.services.splitter_cache import SplitterConfig, get_splitter
+from app.utils.text_headings import (
+    NEXT_HEADING_CANDIDATE,
+    OTHER_LINE_BREAKS,
+    find_headings,
+    is_heading_line,
+)
+
+# (start, end, title or None for a heading-less page, index, char_start, char_end, chunk offsets)
+SectionResult = Tuple[int, int, Optional[str], int, int, int, List[Tuple[int, int]]]
+
+# Where a piece sits in the input: (document position, offset in its text, whole document?)
+PieceRef = Tuple[int, int, bool]
+
+# Headings as (start, end, title), in find_headings format
+Headings = List[Tuple[int, int, str]]
+
+
+def split_pieces(
+    pieces: Sequence[Tuple[str, bool, Optional[Headings]]],
+    config: SplitterConfig,
+) -> List[Tuple[int, List[SectionResult]]]:
+    """
+    Worker entry point: detect headings and split each piece of text.
+
+    A piece is either a whole document or a slice of one that starts at a
+    heading (or at the document start), so its sections are exactly the
+    document's sections. Pieces with layout headings use those instead of
+    detecting them. Returns the heading count and the sections of each
+    piece, with offsets relative to the piece.
+    """
+    splitter = get_splitter(config)
+    out: List[Tuple[int, List[SectionResult]]] = []
+    for text, whole, given in pieces:
+        heads = given if given is not None else find_headings(text)
+        if not heads:
+            # Text before the first heading is dropped unless the document has none
+            sections: List[SectionResult] = (
+                [(0, len(text), None, 1, 0, len(text), chunk_offsets(splitter, text))] if whole else []
+            )
+            out.append((0, sections))
+            continue
+        out.append((len(heads), [
+            (start, end, title, idx, s, e, chunk_offsets(splitter, text[start:end]))
+            for start, end, title, idx, s, e in section_ranges(text, heads)
+        ]))
+    return out
+
+
+def heading_cut_points(text: str, target: int) -> List[int]:
+    """
+    Offsets of heading lines roughly every ``target`` characters, where a
+    document can be cut without changing its sections.
+    """
+    # Exotic line breaks: str.splitlines() boundaries may differ from "\n", keep it whole
+    if len(text) <= target or OTHER_LINE_BREAKS.search(text):
+        return []
+    cuts: List[int] = []
+    pos = target
+    while pos < len(text):
+        cut = None
+        m = NEXT_HEADING_CANDIDATE.search(text, pos - 1)
+        while m is not None:
+            start = m.start() + 1
+            nl = text.find("\n", start)
+            end = len(text) if nl < 0 else nl + 1
+            if is_heading_line(text[start:end].strip()):
+                cut = start
+                break
+            m = NEXT_HEADING_CANDIDATE.search(text, start)
+        if cut is None:
+            break
+        cuts.append(cut)
+        pos = cut + target
+    return cuts
+
+
+def given_cut_points(heads: Headings, target: int) -> List[int]:
+    """``heading_cut_points`` for documents whose headings are already known."""
+    cuts: List[int] = []
+    pos = target
+    for start, _, _ in heads:
+        if start >= pos:
+            cuts.append(start)
+            pos = start + target
+    return cuts
+
+
+class ChunkPool:
+    """
+    Process pool that runs heading detection and splitting for large inputs.
+
+    Documents are cut at heading boundaries into pieces of similar size and
+    grouped into tasks; results come back per task, in input order, so the
+    caller can number chunks exactly as a sequential run would.
+    """
+
+    def __init__(self) -> None:
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def workers(self) -> int:
+        return settings.chunk_pool_workers or os.cpu_count() or 1
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: the server process runs threads, which fork does not copy safely
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    @staticmethod
+    def accepts(texts: Sequence[str]) -> bool:
+        """True when the input is large enough to be worth the IPC round trip."""
+        threshold = settings.chunk_pool_min_chars
+        return threshold > 0 and sum(len(t) for t in texts) >= threshold
+
+    def plan(
+        self,
+        texts: Sequence[str],
+        headings: Optional[Sequence[Optional[Headings]]] = None,
+    ) -> List[List[Tuple[PieceRef, str, Optional[Headings]]]]:
+        """
+        Partition texts into tasks of about ``total / (4 * workers)`` characters.
+        ``headings`` gives the layout headings of each text, None to detect them.
+        """
+        total = sum(len(t) for t in texts)
+        target = max(-(-total // (4 * self.workers)), 16 * 1024)
+        tasks: List[List[Tuple[PieceRef, str, Optional[Headings]]]] = []
+        current: List[Tuple[PieceRef, str, Optional[Headings]]] = []
+        size = 0
+        for i, text in enumerate(texts):
+            heads = headings[i] if headings is not None else None
+            cuts = heading_cut_points(text, target) if heads is None else given_cut_points(heads, target)
+            bounds = [0, *cuts, len(text)]
+            whole = len(bounds) == 2
+            for start, end in zip(bounds, bounds[1:]):
+                piece_heads = None if heads is None else [
+                    (s - start, e - start, title) for s, e, title in heads if start <= s < end
+                ]
+                current.append(((i, start, whole), text if whole else text[start:end], piece_heads))
+                size += end - start
+                if size >= target:
+                    tasks.append(current)
+                    current, size = [], 0
+        if current:
+            tasks.append(current)
+        return tasks
+
+    def submit(
+        self,
+        task: List[Tuple[PieceRef, str, Optional[Headings]]],
+        config: SplitterConfig,
+    ) -> "Tuple[List[PieceRef], asyncio.Future[List[Tuple[int, List[SectionResult]]]]]":
+        """Queue one task; returns its piece refs and a future for its results."""
+        fut: "Future[List[Tuple[int, List[SectionResult]]]]" = self.executor.submit(
+            split_pieces, [(text, ref[2], heads) for ref, text, heads in task], config
+        )
+        return [ref for ref, _, _ in task], asyncio.wrap_future(fut)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+chunk_pool = ChunkPool()
@@ -0,0 +1,148 @@
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+if TYPE_CHECKING:
+    from langchain_text_splitters import TextSplitter
+
+
+class SourceText:
+    """One input page/document: its text and metadata, shared by all its spans."""
+
+    __slots__ = ("text", "metadata")
+
+    def __init__(self, text: str, metadata: Dict[str, Any]) -> None:
+        self.text = text
+        self.metadata = metadata
+
+
+class SectionSpan:
+    """
+    A section as ``text[start:end]`` of its SourceText (already stripped).
+
+    ``char_start``/``char_end`` are the unstripped heading-to-heading range
+    reported as ``section_char_start``/``section_char_end``.
+    """
+
+    __slots__ = ("source", "start", "end", "title", "index", "char_start", "char_end")
+
+    def __init__(
+        self,
+        source: SourceText,
+        start: int,
+        end: int,
+        title: str,
+        index: int,
+        char_start: int,
+        char_end: int,
+    ) -> None:
+        self.source = source
+        self.start = start
+        self.end = end
+        self.title = title
+        self.index = index
+        self.char_start = char_start
+        self.char_end = char_end
+
+    @property
+    def text(self) -> str:
+        return self.source.text[self.start:self.end]
+
+    def metadata(self) -> Dict[str, Any]:
+        return {
+            **self.source.metadata,
+            "section_title": self.title,
+            "section_index": self.index,
+            "section_char_start": self.char_start,
+            "section_char_end": self.char_end,
+        }
+
+    def to_document(self) -> Document:
+        return Document(page_content=self.text, metadata=self.metadata())
+
+
+class ChunkSpan:
+    """
+    A chunk as an offset range into its section's source text.
+
+    ``start_index`` is relative to the section text, as produced by the
+    splitter. Text and metadata are only built on demand, when the chunk is
+    serialized.
+    """
+
+    __slots__ = ("section", "start_index", "length", "chunk_index", "num_chunks", "duplicate_of")
+
+    def __init__(self, section: SectionSpan, start_index: int, length: int, chunk_index: int) -> None:
+        self.section = section
+        self.start_index = start_index
+        self.length = length
+        self.chunk_index = chunk_index
+        self.num_chunks: Optional[int] = None
+        # (canonical chunk_id, its document_id, "exact" or "near") when flagged by dedup
+        self.duplicate_of: Optional[Tuple[str, str, str]] = None
+
+    @property
+    def text(self) -> str:
+        start = self.section.start + self.start_index
+        return self.section.source.text[start:start + self.length]
+
+    @property
+    def source(self) -> Optional[Any]:
+        return self.section.source.metadata.get("source")
+
+    @property
+    def chunk_id(self) -> str:
+        meta = self.section.source.metadata
+        page = meta.get("page") or meta.get("page_number")
+        src = meta.get("source", "unknown")
+        if page:
+            return f"{src}#p{page}#c{self.chunk_index}"
+        return f"{src}#c{self.chunk_index}"
+
+    def metadata(self) -> Dict[str, Any]:
+        meta = self.section.metadata()
+        meta["start_index"] = self.start_index
+        meta["chunk_index"] = self.chunk_index
+        meta["end_index"] = self.start_index + self.length
+        meta["chunk_id"] = self.chunk_id
+        if self.num_chunks is not None:
+            meta["num_chunks"] = self.num_chunks
+        if self.duplicate_of is not None:
+            meta["duplicate_of"], meta["duplicate_of_document"], meta["duplicate_kind"] = self.duplicate_of
+        return meta
+
+    def to_document(self) -> Document:
+        return Document(page_content=self.text, metadata=self.metadata())
+
+
+def section_ranges(
+    text: str, heads: List[Tuple[int, int, str]]
+) -> Iterator[Tuple[int, int, str, int, int, int]]:
+    """
+    Yield ``(start, end, title, index, char_start, char_end)`` for each
+    non-empty heading-to-heading section, with start/end giving the
+    offsets of ``text[char_start:char_end].strip()``.
+    """
+    for idx, (s, _, title) in enumerate(heads, start=1):
+        e = heads[idx][0] if idx < len(heads) else len(text)
+        start, end = s, e
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start < end:
+            yield start, end, title, idx, s, e
+
+
+def chunk_offsets(splitter: "TextSplitter", text: str) -> List[Tuple[int, int]]:
+    """``(start_index, length)`` of each chunk, using the same search as TextSplitter.create_documents."""
+    overlap = splitter._chunk_overlap
+    offsets: List[Tuple[int, int]] = []
+    index = 0
+    previous_chunk_len = 0
+    for piece in splitter.split_text(text):
+        offset = index + previous_chunk_len - overlap
+        index = text.find(piece, max(0, offset))
+        previous_chunk_len = len(piece)
+        offsets.append((index, previous_chunk_len))
+    return offsets
@@ -0,0 +1,334 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config.settings import settings
+from app.services.chunk_spans import ChunkSpan, SectionSpan
+
+
+class ChunkStore:
+    """
+    Persistent copy of the chunks the pipeline returned, so consumers can
+    re-fetch a document's chunks or sections without re-running OCR.
+
+    Documents, sections and chunks go to separate SQLite tables. Page and
+    section metadata is stored once per section, and chunks keep only their
+    own fields, so a chunk's metadata is rebuilt exactly on read.
+    Writing a document again replaces its previous rows. Documents expire
+    after a TTL, and the table is bounded by a number of documents.
+    """
+
+    def __init__(self, path: str, enabled: bool, max_documents: int, ttl_seconds: int) -> None:
+        self.path = Path(path)
+        self.enabled = enabled
+        self.max_documents = max_documents
+        self.ttl_seconds = ttl_seconds
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    async def put(self, document_id: str, chunks: List[ChunkSpan], reset: bool = True) -> None:
+        """
+        Store ``chunks`` for ``document_id``. ``reset`` replaces what was
+        stored before; pass False for the later batches of one streamed document.
+        """
+        if self.enabled:
+            await asyncio.to_thread(self._put, document_id, chunks, reset)
+
+    async def finish(self, document_id: str, totals: Dict[str, int]) -> None:
+        """Record ``num_chunks`` per source once a streamed document is complete."""
+        if self.enabled:
+            await asyncio.to_thread(self._finish, document_id, totals)
+
+    async def document(self, document_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._document, document_id)
+
+    async def documents(self, checksum_sha256: Optional[str], offset: int, limit: int) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self._documents, checksum_sha256, offset, limit)
+
+    async def sections(
+        self, document_id: str, offset: int, limit: int, title: Optional[str] = None
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """A page of sections (and the total count), optionally only those titled ``title``."""
+        return await asyncio.to_thread(self._sections, document_id, offset, limit, title)
+
+    async def chunks(
+        self,
+        document_id: str,
+        offset: int,
+        limit: int,
+        section_title: Optional[str] = None,
+        section: Optional[int] = None,
+    ) -> Tuple[int, List[Tuple[str, Dict[str, Any]]]]:
+        """A page of ``(content, metadata)`` in chunk order, and the total count."""
+        return await asyncio.to_thread(self._chunks, document_id, offset, limit, section_title, section)
+
+    async def chunk(self, document_id: str, chunk_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        return await asyncio.to_thread(self._chunk, document_id, chunk_id)
+
+    # ----------------- SQLite (runs in worker threads) -----------------
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                " document_id TEXT PRIMARY KEY,"
+                " checksum_sha256 TEXT,"
+                " file_name TEXT,"
+                " num_sections INTEGER NOT NULL,"
+                " num_chunks INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sections ("
+                " document_id TEXT NOT NULL,"
+                " seq INTEGER NOT NULL,"
+                " page_number INTEGER,"
+                " section_index INTEGER NOT NULL,"
+                " section_title TEXT NOT NULL,"
+                " char_start INTEGER NOT NULL,"
+                " char_end INTEGER NOT NULL,"
+                " num_chunks INTEGER NOT NULL,"
+                " metadata TEXT NOT NULL,"
+                " PRIMARY KEY (document_id, seq))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunks ("
+                " document_id TEXT NOT NULL,"
+                " seq INTEGER NOT NULL,"
+                " section_seq INTEGER NOT NULL,"
+                " chunk_id TEXT NOT NULL,"
+                " source TEXT,"
+                " chunk_index INTEGER NOT NULL,"
+                " start_index INTEGER NOT NULL,"
+                " end_index INTEGER NOT NULL,"
+                " num_chunks INTEGER,"
+                " duplicate_of TEXT,"
+                " content TEXT NOT NULL,"
+                " PRIMARY KEY (document_id, seq))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS documents_checksum ON documents (checksum_sha256)")
+            conn.execute("CREATE INDEX IF NOT EXISTS sections_title ON sections (section_title)")
+            conn.execute("CREATE INDEX IF NOT EXISTS chunks_chunk_id ON chunks (chunk_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS chunks_section ON chunks (document_id, section_seq)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _put(self, document_id: str, chunks: List[ChunkSpan], reset: bool) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            if reset:
+                conn.execute("DELETE FROM chunks WHERE document_id = ?", (document_id,))
+                conn.execute("DELETE FROM sections WHERE document_id = ?", (document_id,))
+                chunk_seq = section_seq = 0
+            else:
+                chunk_seq = self._next_seq(conn, "chunks", document_id)
+                section_seq = self._next_seq(conn, "sections", document_id)
+
+            section_rows: Dict[int, List[Any]] = {}
+            chunk_rows: List[Tuple[Any, ...]] = []
+            for c in chunks:
+                row = section_rows.get(id(c.section))
+                if row is None:
+                    row = section_rows[id(c.section)] = self._section_row(document_id, section_seq, c.section)
+                    section_seq += 1
+                row[7] += 1
+                chunk_rows.append((
+                    document_id,
+                    chunk_seq,
+                    row[1],
+                    c.chunk_id,
+                    None if c.source is None else str(c.source),
+                    c.chunk_index,
+                    c.start_index,
+                    c.start_index + c.length,
+                    c.num_chunks,
+                    None if c.duplicate_of is None else json.dumps(c.duplicate_of),
+                    c.text,
+                ))
+                chunk_seq += 1
+            conn.executemany("INSERT INTO sections VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", section_rows.values())
+            conn.executemany("INSERT INTO chunks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", chunk_rows)
+
+            meta = chunks[0].section.source.metadata if chunks else {}
+            conn.execute(
+                "INSERT INTO documents (document_id, checksum_sha256, file_name, num_sections, num_chunks,"
+                " created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (document_id) DO UPDATE SET"
+                # Later batches of a stream, or an empty version, carry no metadata
+                " checksum_sha256 = COALESCE(excluded.checksum_sha256, documents.checksum_sha256),"
+                " file_name = COALESCE(excluded.file_name, documents.file_name),"
+                " num_sections = excluded.num_sections, num_chunks = excluded.num_chunks,"
+                " updated_at = excluded.updated_at",
+                (document_id, meta.get("checksum_sha256"), meta.get("file_name"),
+                 section_seq, chunk_seq, now, now),
+            )
+            if reset:
+                self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        expired = [
+            row[0]
+            for row in conn.execute(
+                "SELECT document_id FROM documents WHERE updated_at < ?", (now - self.ttl_seconds,)
+            ).fetchall()
+        ]
+        total = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0] - len(expired)
+        if total > self.max_documents:
+            # Then the least recently written documents until the table fits again
+            expired += [
+                row[0]
+                for row in conn.execute(
+                    "SELECT document_id FROM documents WHERE updated_at >= ? ORDER BY updated_at LIMIT ?",
+                    (now - self.ttl_seconds, total - self.max_documents),
+                ).fetchall()
+            ]
+        for table in ("chunks", "sections", "documents"):
+            conn.executemany(f"DELETE FROM {table} WHERE document_id = ?", [(d,) for d in expired])
+
+    @staticmethod
+    def _section_row(document_id: str, seq: int, section: SectionSpan) -> List[Any]:
+        meta = section.metadata()
+        page = meta.get("page") or meta.get("page_number")
+        return [
+            document_id,
+            seq,
+            page if isinstance(page, int) else None,
+            section.index,
+            section.title,
+            section.char_start,
+            section.char_end,
+            0,
+            json.dumps(meta, ensure_ascii=False, default=str),
+        ]
+
+    @staticmethod
+    def _next_seq(conn: sqlite3.Connection, table: str, document_id: str) -> int:
+        row = conn.execute(f"SELECT MAX(seq) FROM {table} WHERE document_id = ?", (document_id,)).fetchone()
+        return 0 if row[0] is None else row[0] + 1
+
+    def _finish(self, document_id: str, totals: Dict[str, int]) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "UPDATE chunks SET num_chunks = ? WHERE document_id = ? AND source = ?",
+                [(n, document_id, str(src)) for src, n in totals.items() if src],
+            )
+            conn.execute(
+                "UPDATE chunks SET num_chunks = 1 WHERE document_id = ? AND (source IS NULL OR source = '')",
+                (document_id,),
+            )
+            conn.commit()
+
+    def _document(self, document_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            cur = self._connect().execute("SELECT * FROM documents WHERE document_id = ?", (document_id,))
+            row = cur.fetchone()
+        if row is None:
+            return None
+        return dict(zip([d[0] for d in cur.description], row))
+
+    def _documents(self, checksum_sha256: Optional[str], offset: int, limit: int) -> List[Dict[str, Any]]:
+        query = "SELECT * FROM documents"
+        params: List[Any] = []
+        if checksum_sha256 is not None:
+            query += " WHERE checksum_sha256 = ?"
+            params.append(checksum_sha256)
+        query += " ORDER BY updated_at DESC LIMIT ? OFFSET ?"
+        with self._lock:
+            cur = self._connect().execute(query, (*params, limit, offset))
+            rows = cur.fetchall()
+        names = [d[0] for d in cur.description]
+        return [dict(zip(names, row)) for row in rows]
+
+    def _sections(
+        self, document_id: str, offset: int, limit: int, title: Optional[str]
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        where = "document_id = ?" + (" AND section_title = ?" if title is not None else "")
+        params: Tuple[Any, ...] = (document_id,) if title is None else (document_id, title)
+        with self._lock:
+            conn = self._connect()
+            total = conn.execute(f"SELECT COUNT(*) FROM sections WHERE {where}", params).fetchone()[0]
+            rows = conn.execute(
+                "SELECT seq, page_number, section_index, section_title, char_start, char_end, num_chunks"
+                f" FROM sections WHERE {where} ORDER BY seq LIMIT ? OFFSET ?",
+                (*params, limit, offset),
+            ).fetchall()
+        names = ("seq", "page_number", "section_index", "section_title", "char_start", "char_end", "num_chunks")
+        return total, [dict(zip(names, row)) for row in rows]
+
+    _CHUNK_COLUMNS = (
+        "SELECT c.content, s.metadata, c.start_index, c.chunk_index, c.end_index, c.chunk_id,"
+        " c.num_chunks, c.duplicate_of FROM chunks c JOIN sections s"
+        " ON s.document_id = c.document_id AND s.seq = c.section_seq"
+    )
+
+    def _chunks(
+        self,
+        document_id: str,
+        offset: int,
+        limit: int,
+        section_title: Optional[str],
+        section: Optional[int],
+    ) -> Tuple[int, List[Tuple[str, Dict[str, Any]]]]:
+        where = "c.document_id = ?"
+        params: List[Any] = [document_id]
+        if section_title is not None:
+            where += " AND s.section_title = ?"
+            params.append(section_title)
+        if section is not None:
+            where += " AND c.section_seq = ?"
+            params.append(section)
+        with self._lock:
+            conn = self._connect()
+            total = conn.execute(
+                "SELECT COUNT(*) FROM chunks c JOIN sections s"
+                f" ON s.document_id = c.document_id AND s.seq = c.section_seq WHERE {where}",
+                params,
+            ).fetchone()[0]
+            rows = conn.execute(
+                f"{self._CHUNK_COLUMNS} WHERE {where} ORDER BY c.seq LIMIT ? OFFSET ?",
+                (*params, limit, offset),
+            ).fetchall()
+        return total, [self._chunk_record(row) for row in rows]
+
+    def _chunk(self, document_id: str, chunk_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        with self._lock:
+            row = self._connect().execute(
+                f"{self._CHUNK_COLUMNS} WHERE c.document_id = ? AND c.chunk_id = ? ORDER BY c.seq LIMIT 1",
+                (document_id, chunk_id),
+            ).fetchone()
+        return None if row is None else self._chunk_record(row)
+
+    @staticmethod
+    def _chunk_record(row: Tuple[Any, ...]) -> Tuple[str, Dict[str, Any]]:
+        """Rebuild ``(content, metadata)`` in the key order of ChunkSpan.metadata()."""
+        content, section_meta, start_index, chunk_index, end_index, chunk_id, num_chunks, duplicate = row
+        meta = json.loads(section_meta)
+        meta["start_index"] = start_index
+        meta["chunk_index"] = chunk_index
+        meta["end_index"] = end_index
+        meta["chunk_id"] = chunk_id
+        if num_chunks is not None:
+            meta["num_chunks"] = num_chunks
+        if duplicate is not None:
+            meta["duplicate_of"], meta["duplicate_of_document"], meta["duplicate_kind"] = json.loads(duplicate)
+        return content, meta
+
+
+chunk_store = ChunkStore(
+    path=settings.chunk_store_path,
+    enabled=settings.chunk_store_enabled,
+    max_documents=settings.chunk_store_max_documents,
+    ttl_seconds=settings.chunk_store_ttl_seconds,
+)
@@ -1,58 +1,141 @@
+import asyncio
+import hashlib
 from collections import defaultdict
-from typing import List, Optional, Dict, Tuple
+from typing import TYPE_CHECKING, AsyncIterator, Iterable, Iterator, List, Mapping, Optional, Dict, Tuple
 from langchain_core.documents import Document
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from app.config.settings import settings
+from starlette.concurrency import iterate_in_threadpool
+from app.services.chunk_pool import chunk_pool
+from app.services.chunk_spans import ChunkSpan, SectionSpan, SourceText, chunk_offsets, section_ranges
+from app.services.splitter_cache import SplitterConfig, get_splitter, make_config
+from app.utils.layout import LAYOUT_HEADINGS_KEY
+from app.utils.metrics import stage
 from app.utils.text_headings import find_headings
 
+if TYPE_CHECKING:
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
 
 class ChunkingService:
 
     def __init__(self) -> None:
 
-        self.splitter = RecursiveCharacterTextSplitter(
-            chunk_size=settings.chunk_size,
-            chunk_overlap=settings.chunk_overlap,
-            separators=settings.chunk_separators,
-            add_start_index=True,
-            is_separator_regex=False,
-        )
+        # Default splitter config; requests with their own options get one from the splitter cache
+        self.config = make_config()
+
+    @property
+    def splitter(self) -> "RecursiveCharacterTextSplitter":
+        # Built on first use so importing the service stays cheap
+        return get_splitter(self.config)
+
+    def split_documents(
+        self, docs: List[Document], config: Optional[SplitterConfig] = None
+    ) -> List[Document]:
+        return [c.to_document() for c in self.split_spans(docs, config)]
 
-    def split_documents(self, docs: List[Document]) -> List[Document]:
-        # Split docs by title
-        chunks = self._split_docs_by_titles(docs)
-
-        # Split docs recursive
-        chunks = self.splitter.split_documents(chunks)
-
-        # Return empty 
-        if not chunks:
-            return []
-
-        bucket: dict[str, List[int]] = defaultdict(list)
-        for i, c in enumerate(chunks):
-            key = c.metadata.get("source") or id(c)
-            bucket[key].append(i)
-
-        for key, idxs in bucket.items():
-            total = len(idxs)
-            for local_idx, global_idx in enumerate(idxs, start=1):
-                c = chunks[global_idx]
-                c.metadata["chunk_index"] = local_idx
-                c.metadata["num_chunks"] = total
-                if "start_index" in c.metadata:
-                    c.metadata["end_index"] = (
-                        c.metadata["start_index"] + len(c.page_content)
-                    )
-                page = c.metadata.get("page") or c.metadata.get("page_number")
-                src = c.metadata.get("source", "unknown")
-                if page:
-                    c.metadata["chunk_id"] = f"{src}#p{page}#c{local_idx}"
-                else:
-                    c.metadata["chunk_id"] = f"{src}#c{local_idx}"
+    def iter_split_documents(
+        self, docs: Iterable[Document], config: Optional[SplitterConfig] = None
+    ) -> Iterator[List[Document]]:
+        """
+        Split documents section by section, yielding each section's chunks as soon
+        as they are ready. ``chunk_index`` and ``chunk_id`` are numbered per
+        source exactly as in ``split_documents``; ``num_chunks`` is only known
+        once the whole input is consumed, so it is left to the caller.
+        ``config`` selects per-request splitter settings (see ``make_config``).
+        """
+        for batch in self.iter_split_spans(docs, config):
+            yield [c.to_document() for c in batch]
+
+    def split_spans(
+        self, docs: Iterable[Document], config: Optional[SplitterConfig] = None
+    ) -> List[ChunkSpan]:
+        """Like ``split_documents`` but returns offset spans with ``num_chunks`` set."""
+        chunks = [c for batch in self.iter_split_spans(docs, config) for c in batch]
+        return self._count_chunks(chunks)
+
+    @staticmethod
+    def _count_chunks(chunks: List[ChunkSpan]) -> List[ChunkSpan]:
+        totals: Dict[str, int] = defaultdict(int)
+        for c in chunks:
+            totals[c.source or ""] += 1
+        for c in chunks:
+            src = c.source
+            c.num_chunks = totals[src] if src else 1
 
         return chunks
 
+    def split_by_section(
+        self,
+        docs: Iterable[Document],
+        config: Optional[SplitterConfig] = None,
+        known: Optional[Mapping[str, List[Tuple[int, int]]]] = None,
+    ) -> List[Tuple[str, List[ChunkSpan]]]:
+        """
+        Chunks grouped by section, each with a hash of the section text and
+        splitter config. Sections whose hash is in ``known`` reuse those chunk
+        offsets instead of being split again; the result is identical to
+        ``split_spans`` either way.
+        """
+        config = config if config is not None else self.config
+        splitter = get_splitter(config)
+        salt = repr(config).encode("utf-8")
+        counters: Dict[str, int] = defaultdict(int)
+        out: List[Tuple[str, List[ChunkSpan]]] = []
+        for d in docs:
+            for section in self._split_sections(d):
+                text = section.text
+                digest = hashlib.sha256(salt + b"\0" + text.encode("utf-8")).hexdigest()
+                offsets = known.get(digest) if known else None
+                if offsets is None:
+                    offsets = chunk_offsets(splitter, text)
+                out.append((digest, self._section_chunks(section, offsets, counters)))
+        self._count_chunks([c for _, chunks in out for c in chunks])
+        return out
+
+    async def asplit_spans(
+        self, docs: List[Document], config: Optional[SplitterConfig] = None
+    ) -> List[ChunkSpan]:
+        """
+        ``split_spans`` for the request handlers: large inputs are split in
+        the chunking process pool, small ones inline.
+        """
+        if not chunk_pool.accepts([d.page_content or "" for d in docs]):
+            return self.split_spans(docs, config)
+        chunks = [c async for batch in self._pool_split_spans(docs, config) for c in batch]
+        return self._count_chunks(chunks)
+
+    async def aiter_split_spans(
+        self, docs: List[Document], config: Optional[SplitterConfig] = None
+    ) -> AsyncIterator[List[ChunkSpan]]:
+        """Async ``iter_split_spans``; runs in the process pool or the threadpool."""
+        if chunk_pool.accepts([d.page_content or "" for d in docs]):
+            batches = self._pool_split_spans(docs, config)
+        else:
+            batches = iterate_in_threadpool(self.iter_split_spans(docs, config))
+        async for batch in batches:
+            yield batch
+
+    def iter_split_spans(
+        self, docs: Iterable[Document], config: Optional[SplitterConfig] = None
+    ) -> Iterator[List[ChunkSpan]]:
+        """
+        Compact form of ``iter_split_documents``: chunks are offsets into the
+        original page text and share one metadata dict per page. Only the
+        section currently being split is copied out of the page text.
+        """
+        splitter = get_splitter(config) if config is not None else self.splitter
+        counters: Dict[str, int] = defaultdict(int)
+        for d in docs:
+            # Split docs by title
+            with stage("headings"):
+                sections = self._split_sections(d)
+            for section in sections:
+                # Split docs recursive
+                with stage("splitter"):
+                    offsets = chunk_offsets(splitter, section.text)
+                chunks = self._section_chunks(section, offsets, counters)
+                if chunks:
+                    yield chunks
+
 
     def split_text(
         self,
@@ -68,65 +151,111 @@ class ChunkingService:
         For each Document, detect headings and create section-level Documents.
         If no heading is found, the whole Document becomes a single section.
         """
-        out: List[Document] = []
-        for d in docs:
-            text = d.page_content or ""
-            base_meta = dict(d.metadata or {})
+        return [s.to_document() for d in docs for s in self._split_sections(d)]
+
+    @staticmethod
+    def _source(doc: Document) -> Tuple[SourceText, Optional[List[Tuple[int, int, str]]]]:
+        """The document's SourceText and the headings OCR found from its layout, if any."""
+        metadata = dict(doc.metadata or {})
+        given = metadata.pop(LAYOUT_HEADINGS_KEY, None)
+        heads = [(start, end, title) for start, end, title in given] if given else None
+        return SourceText(doc.page_content or "", metadata), heads
+
+    @classmethod
+    def _split_sections(cls, doc: Document) -> List[SectionSpan]:
+        """
+        Section spans of one Document, without copying its text or metadata.
+        Layout headings from OCR are used as given; other text falls back to
+        regex heading detection.
+        """
+        source, heads = cls._source(doc)
+        text = source.text
+        if heads is None:
             heads = find_headings(text)
 
-            if not heads:
-                # No headings: single section
-                out.append(self._make_section_doc(
-                    text=text,
-                    base_meta=base_meta,
-                    section_title=base_meta.get("title") or "Document",
-                    section_index=1,
-                    char_start=0,
-                    char_end=len(text),
-                ))
-                continue
-
-            # Build section ranges from consecutive headings
-            ranges: List[Tuple[int, int, str]] = []
-            for i, (s, e, title) in enumerate(heads):
-                start = s
-                end = heads[i + 1][0] if i + 1 < len(heads) else len(text)
-                ranges.append((start, end, title))
-
-            # Create section docs
-            for idx, (s, e, title) in enumerate(ranges, start=1):
-                sec_text = text[s:e].strip()
-                if not sec_text:
-                    continue
-                out.append(self._make_section_doc(
-                    text=sec_text,
-                    base_meta=base_meta,
-                    section_title=title,
-                    section_index=idx,
-                    char_start=s,
-                    char_end=e,
-                ))
-        return out
+        if not heads:
+            # No headings: single section
+            return [SectionSpan(
+                source,
+                start=0,
+                end=len(text),
+                title=source.metadata.get("title") or "Document",
+                index=1,
+                char_start=0,
+                char_end=len(text),
+            )]
+
+        # Build section ranges from consecutive headings
+        return [
+            SectionSpan(source, start, end, title, idx, s, e)
+            for start, end, title, idx, s, e in section_ranges(text, heads)
+        ]
+
+    async def _pool_split_spans(
+        self, docs: List[Document], config: Optional[SplitterConfig] = None
+    ) -> AsyncIterator[List[ChunkSpan]]:
+        """
+        Split in the process pool. Tasks run concurrently but are consumed in
+        input order, so numbering matches ``iter_split_spans``.
+        """
+        pairs = [self._source(d) for d in docs]
+        sources = [source for source, _ in pairs]
+        tasks = await asyncio.to_thread(
+            chunk_pool.plan, [s.text for s in sources], [heads for _, heads in pairs]
+        )
+        del pairs
+        config = config if config is not None else self.config
+        submitted = [chunk_pool.submit(task, config) for task in tasks]
+        del tasks
 
+        counters: Dict[str, int] = defaultdict(int)
+        # Headings seen in earlier pieces of each document, to offset section_index
+        heads_before: Dict[int, int] = defaultdict(int)
+        try:
+            for refs, fut in submitted:
+                with stage("chunk_pool"):
+                    results = await fut
+                for (i, offset, _), (num_heads, sections) in zip(refs, results):
+                    source = sources[i]
+                    base_index = heads_before[i]
+                    heads_before[i] += num_heads
+                    for start, end, title, idx, s, e, offsets in sections:
+                        section = SectionSpan(
+                            source,
+                            start=offset + start,
+                            end=offset + end,
+                            title=title if title is not None else (source.metadata.get("title") or "Document"),
+                            index=base_index + idx,
+                            char_start=offset + s,
+                            char_end=offset + e,
+                        )
+                        chunks = self._section_chunks(section, offsets, counters)
+                        if chunks:
+                            yield chunks
+        finally:
+            # Consumer stopped early: drop work that has not started yet
+            for _, fut in submitted:
+                fut.cancel()
 
     @staticmethod
-    def _make_section_doc(
-        text: str,
-        base_meta: Dict,
-        section_title: str,
-        section_index: int,
-        char_start: int,
-        char_end: int,
-    ) -> Document:
-        meta = {
-            **base_meta,
-            "section_title": section_title,
-            "section_index": section_index,
-            "section_char_start": char_start,
-            "section_char_end": char_end,
-        }
-        return Document(page_content=text, metadata=meta)
-    
+    def _section_chunks(
+        section: SectionSpan,
+        offsets: List[Tuple[int, int]],
+        counters: Dict[str, int],
+    ) -> List[ChunkSpan]:
+        """Number a section's chunks per source, continuing ``counters``."""
+        src = section.source.metadata.get("source")
+        chunks: List[ChunkSpan] = []
+        for start_index, length in offsets:
+            if src:
+                counters[src] += 1
+                local_idx = counters[src]
+            else:
+                # Chunks without a source are numbered on their own
+                local_idx = 1
+            chunks.append(ChunkSpan(section, start_index, length, local_idx))
+        return chunks
+
 chunk_service = ChunkingService()
 
 
@@ -0,0 +1,173 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.config.settings import settings
+from app.services.chunk_spans import ChunkSpan
+from app.utils.fingerprints import content_hash, hamming, simhash, simhash_bands
+
+def _signed(value: int) -> int:
+    """SQLite integers are signed 64-bit."""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+class DedupService:
+    """
+    Cross-document duplicate chunk detection against a persistent fingerprint index.
+
+    Every canonical (first seen) chunk is stored with a hash of its normalized
+    text and a 64-bit SimHash. Later chunks with the same hash are exact
+    duplicates; chunks whose SimHash is within ``max_distance`` bits are near
+    duplicates, found through banded lookups. Only chunks of other documents
+    count: text repeated within one document is not a duplicate, and
+    re-ingesting a document first forgets its own fingerprints.
+    """
+
+    def __init__(self, path: str, near_duplicates: bool, max_distance: int) -> None:
+        self.path = Path(path)
+        self.near_duplicates = near_duplicates
+        self.max_distance = max(0, min(max_distance, 15))
+        # Pigeonhole: hashes differing in at most max_distance bits share one of
+        # max_distance + 1 bands exactly
+        self.bands = self.max_distance + 1
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {"checked": 0, "exact": 0, "near": 0}
+
+    async def mark(self, document_id: str, chunks: List[ChunkSpan], reset: bool = True) -> int:
+        """
+        Flag duplicates in ``chunks`` (sets ``duplicate_of``) and index the rest.
+
+        ``reset`` drops this document's previous fingerprints first; pass False
+        for the later batches of one streamed document. Returns the number of
+        duplicates found.
+        """
+        found = await asyncio.to_thread(self._mark, document_id, chunks, reset)
+        self.counters["checked"] += len(chunks)
+        return found
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.counters)
+
+    # ----------------- SQLite (runs in worker threads) -----------------
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunk_fingerprints ("
+                " document_id TEXT NOT NULL,"
+                " chunk_id TEXT NOT NULL,"
+                " content_hash TEXT NOT NULL,"
+                " simhash INTEGER NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS simhash_bands ("
+                " band TEXT NOT NULL,"
+                " value INTEGER NOT NULL,"
+                " simhash INTEGER NOT NULL,"
+                " document_id TEXT NOT NULL,"
+                " chunk_id TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS chunk_fingerprints_hash ON chunk_fingerprints (content_hash)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS chunk_fingerprints_doc ON chunk_fingerprints (document_id)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS simhash_bands_value ON simhash_bands (band, value)")
+            conn.execute("CREATE INDEX IF NOT EXISTS simhash_bands_doc ON simhash_bands (document_id)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _mark(
+        self,
+        document_id: str,
+        chunks: List[ChunkSpan],
+        reset: bool,
+    ) -> int:
+        fingerprints = [
+            (content_hash(text), simhash(text) if self.near_duplicates else 0)
+            for text in (c.text for c in chunks)
+        ]
+        found = 0
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            if reset:
+                conn.execute("DELETE FROM chunk_fingerprints WHERE document_id = ?", (document_id,))
+                conn.execute("DELETE FROM simhash_bands WHERE document_id = ?", (document_id,))
+            for c, (digest, fingerprint) in zip(chunks, fingerprints):
+                match = self._find(conn, document_id, digest, fingerprint)
+                if match is not None:
+                    c.duplicate_of = match
+                    self.counters[match[2]] += 1
+                    found += 1
+                    continue
+                chunk_id = c.chunk_id
+                conn.execute(
+                    "INSERT INTO chunk_fingerprints (document_id, chunk_id, content_hash, simhash, created_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (document_id, chunk_id, digest, _signed(fingerprint), now),
+                )
+                if fingerprint:
+                    conn.executemany(
+                        "INSERT INTO simhash_bands (band, value, simhash, document_id, chunk_id)"
+                        " VALUES (?, ?, ?, ?, ?)",
+                        [
+                            (band, value, _signed(fingerprint), document_id, chunk_id)
+                            for band, value in self._bands(fingerprint)
+                        ],
+                    )
+            conn.commit()
+        return found
+
+    def _find(
+        self, conn: sqlite3.Connection, document_id: str, digest: str, fingerprint: int
+    ) -> Optional[Tuple[str, str, str]]:
+        """The canonical chunk of another document that this one duplicates, if any."""
+        row = conn.execute(
+            "SELECT chunk_id, document_id FROM chunk_fingerprints"
+            " WHERE content_hash = ? AND document_id != ? ORDER BY created_at LIMIT 1",
+            (digest, document_id),
+        ).fetchone()
+        if row is not None:
+            return row[0], row[1], "exact"
+        if not fingerprint:
+            return None
+
+        best: Optional[Tuple[int, str, str]] = None
+        for band, value in self._bands(fingerprint):
+            for other, doc_id, chunk_id in conn.execute(
+                "SELECT simhash, document_id, chunk_id FROM simhash_bands"
+                " WHERE band = ? AND value = ? AND document_id != ?",
+                (band, value, document_id),
+            ):
+                distance = hamming(fingerprint, other & ((1 << 64) - 1))
+                if distance <= self.max_distance and (best is None or distance < best[0]):
+                    best = (distance, chunk_id, doc_id)
+        if best is None:
+            return None
+        return best[1], best[2], "near"
+
+    def _bands(self, fingerprint: int) -> List[Tuple[str, int]]:
+        # Band ids name the banding scheme, so rows written under another
+        # max_distance never match
+        return [
+            (f"{self.bands}/{i}", value)
+            for i, value in enumerate(simhash_bands(fingerprint, self.bands))
+        ]
+
+
+dedup_service = DedupService(
+    path=settings.dedup_db_path,
+    near_duplicates=settings.dedup_near_duplicates,
+    max_distance=settings.dedup_simhash_max_distance,
+)
@@ -0,0 +1,229 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.api.schemas.ocr_chunking import OCRChunkingRequest
+from app.config.settings import settings
+from app.services.pipeline_service import pipeline_service
+from app.utils.metrics import timed_scope
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when the job queue already holds ``job_queue_max_size`` jobs."""
+
+
+class JobService:
+    """
+    Persistent OCR-chunking job queue drained by a bounded worker pool.
+
+    Jobs live in a SQLite table, so queued work survives a restart. Running
+    jobs hold a lease that their worker renews; a job whose lease expires
+    (its process died) is picked up again by any worker sharing the file.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        workers: int,
+        max_queued: int,
+        lease_seconds: int,
+        max_attempts: int,
+        retention_seconds: int,
+    ) -> None:
+        self.path = Path(path)
+        self.workers = workers
+        self.max_queued = max_queued
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retention_seconds = retention_seconds
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._wakeup = asyncio.Event()
+        self._tasks: List["asyncio.Task[None]"] = []
+
+    async def start(self) -> None:
+        await asyncio.to_thread(self._connect)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        # Interrupted jobs keep their 'running' row and are re-claimed once
+        # their lease expires after the next start.
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, payload: OCRChunkingRequest) -> Dict[str, Any]:
+        job_id = uuid.uuid4().hex
+        await asyncio.to_thread(self._insert, job_id, payload)
+        self._wakeup.set()
+        return {"job_id": job_id, "status": "queued"}
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._select, job_id)
+
+    async def stats(self) -> Dict[str, int]:
+        return await asyncio.to_thread(self._counts)
+
+    # ----------------- Worker loop -----------------
+
+    async def _worker(self) -> None:
+        while True:
+            job = await asyncio.to_thread(self._claim)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    # Also poll so expired leases from other processes get picked up
+                    await asyncio.wait_for(self._wakeup.wait(), self.lease_seconds / 2)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        job_id = job["job_id"]
+        if job["attempts"] > self.max_attempts:
+            await asyncio.to_thread(
+                self._finish, job_id, "failed", None, "Job exceeded the maximum number of attempts."
+            )
+            return
+
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            payload = OCRChunkingRequest.model_validate_json(job["payload"])
+            with timed_scope():
+                response = await pipeline_service.ocr_chunking(payload)
+            await asyncio.to_thread(
+                self._finish, job_id, "succeeded", response.model_dump_json(), None
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            await asyncio.to_thread(self._finish, job_id, "failed", None, str(exc))
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            await asyncio.to_thread(self._renew, job_id)
+
+    # ----------------- SQLite (runs in worker threads) -----------------
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " job_id TEXT PRIMARY KEY,"
+                " document_id TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " result TEXT,"
+                " error TEXT,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " lease_expires_at REAL,"
+                " created_at REAL NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _insert(self, job_id: str, payload: OCRChunkingRequest) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND updated_at < ?",
+                (now - self.retention_seconds,),
+            )
+            queued = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+            if queued >= self.max_queued:
+                conn.commit()
+                raise JobQueueFullError(f"Job queue is full ({queued} jobs waiting).")
+            conn.execute(
+                "INSERT INTO jobs (job_id, document_id, status, payload, created_at, updated_at)"
+                " VALUES (?, ?, 'queued', ?, ?, ?)",
+                (job_id, payload.document_id, payload.model_dump_json(), now, now),
+            )
+            conn.commit()
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1,"
+                " lease_expires_at = ?, updated_at = ?"
+                " WHERE job_id = ("
+                "  SELECT job_id FROM jobs"
+                "  WHERE status = 'queued' OR (status = 'running' AND lease_expires_at < ?)"
+                "  ORDER BY created_at LIMIT 1)"
+                " RETURNING job_id, payload, attempts",
+                (now + self.lease_seconds, now, now),
+            ).fetchone()
+            conn.commit()
+        return dict(row) if row is not None else None
+
+    def _renew(self, job_id: str) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE job_id = ? AND status = 'running'",
+                (now + self.lease_seconds, job_id),
+            )
+            conn.commit()
+
+    def _finish(self, job_id: str, status: str, result: Optional[str], error: Optional[str]) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, lease_expires_at = NULL,"
+                " updated_at = ? WHERE job_id = ?",
+                (status, result, error, time.time(), job_id),
+            )
+            conn.commit()
+
+    def _select(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT job_id, document_id, status, result, error, attempts, created_at, updated_at"
+                " FROM jobs WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def _counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall()
+        return {status: n for status, n in rows}
+
+
+job_service = JobService(
+    path=settings.job_db_path,
+    workers=settings.job_workers,
+    max_queued=settings.job_queue_max_size,
+    lease_seconds=settings.job_lease_seconds,
+    max_attempts=settings.job_max_attempts,
+    retention_seconds=settings.job_retention_seconds,
+)
@@ -0,0 +1,184 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from app.config.settings import settings
+from app.utils.layout import LAYOUT_HEADINGS_KEY
+
+# (page_content, page, layout headings) per page, immutable so cached entries
+# can be shared safely
+CachedPages = Tuple[Tuple[str, Optional[int], Optional[List[Any]]], ...]
+
+
+class OCRResultCache:
+    """
+    Content-addressed cache of cleaned OCR pages.
+
+    Keys combine the document checksum with the Azure DI model and mode. A
+    small in-process LRU sits in front of a SQLite table of zlib-compressed
+    entries, which is bounded by total size and expires entries after a TTL.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        memory_items: int,
+        max_bytes: int,
+        ttl_seconds: int,
+    ) -> None:
+        self.path = Path(path)
+        self.memory_items = memory_items
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[str, Tuple[float, CachedPages]]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+
+    @staticmethod
+    def make_key(checksum: str, api_model: str, mode: str) -> str:
+        return f"{checksum}:{api_model}:{mode}"
+
+    async def get(self, key: str) -> Optional[List[Document]]:
+        now = time.time()
+        hit = self._memory.get(key)
+        if hit is not None and now - hit[0] <= self.ttl_seconds:
+            self._memory.move_to_end(key)
+            self.counters["memory_hits"] += 1
+            return self._to_documents(hit[1])
+
+        row = await asyncio.to_thread(self._disk_get, key, now)
+        if row is None:
+            self.counters["misses"] += 1
+            return None
+
+        self.counters["disk_hits"] += 1
+        self._remember(key, row)
+        return self._to_documents(row[1])
+
+    async def put(self, key: str, docs: List[Document]) -> None:
+        pages: CachedPages = tuple(
+            (d.page_content, d.metadata.get("page"), d.metadata.get(LAYOUT_HEADINGS_KEY)) for d in docs
+        )
+        entry = (time.time(), pages)
+        self._remember(key, entry)
+        await asyncio.to_thread(self._disk_put, key, entry)
+        self.counters["stores"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+        return {
+            **self.counters,
+            "hits": hits,
+            "memory_items": len(self._memory),
+        }
+
+    def _remember(self, key: str, entry: Tuple[float, CachedPages]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    @staticmethod
+    def _to_documents(pages: CachedPages) -> List[Document]:
+        docs: List[Document] = []
+        for content, page, heads in pages:
+            metadata: Dict[str, Any] = {} if page is None else {"page": page}
+            if heads:
+                metadata[LAYOUT_HEADINGS_KEY] = [tuple(h) for h in heads]
+            docs.append(Document(page_content=content, metadata=metadata))
+        return docs
+
+    # ----------------- SQLite tier (runs in worker threads) -----------------
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ocr_cache ("
+                " key TEXT PRIMARY KEY,"
+                " value BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ocr_cache_accessed ON ocr_cache (accessed_at)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[float, CachedPages]]:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, created_at FROM ocr_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM ocr_cache WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            conn.execute(
+                "UPDATE ocr_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            conn.commit()
+        pages = json.loads(zlib.decompress(row[0]))
+        # Entries written before layout sectioning have no headings
+        return row[1], tuple((entry[0], entry[1], entry[2] if len(entry) > 2 else None) for entry in pages)
+
+    def _disk_put(self, key: str, entry: Tuple[float, CachedPages]) -> None:
+        created_at, pages = entry
+        blob = zlib.compress(json.dumps(pages, ensure_ascii=False).encode("utf-8"))
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO ocr_cache (key, value, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), created_at, created_at),
+            )
+            conn.execute(
+                "DELETE FROM ocr_cache WHERE created_at < ?",
+                (created_at - self.ttl_seconds,),
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used entries until the table fits again
+        for key, size in conn.execute(
+            "SELECT key, size FROM ocr_cache ORDER BY accessed_at"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM ocr_cache WHERE key = ?", (key,))
+            total -= size
+            self.counters["evictions"] += 1
+
+
+ocr_cache = OCRResultCache(
+    path=settings.ocr_cache_path,
+    memory_items=settings.ocr_cache_memory_items,
+    max_bytes=settings.ocr_cache_max_bytes,
+    ttl_seconds=settings.ocr_cache_ttl_seconds,
+)
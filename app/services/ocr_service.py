@@ -1,53 +1,166 @@
 from pathlib import Path
-from typing import List, Union
+from typing import Awaitable, List, Literal, Tuple, Union
+from urllib.parse import urlsplit, urlunsplit
 from datetime import datetime, timezone
-from urllib.parse import urlparse
+import asyncio
 import hashlib
-import re
-import requests
+import mimetypes
 
 from langchain_core.documents import Document
-from app.clients.azure_di_client import AzureDIClient
+from app.clients.azure_di_client import AsyncAzureDIClient
+from app.clients.download_client import DownloadClient, DownloadedSource, guess_file_name
+from app.config.settings import settings
+from app.services.ocr_cache import OCRResultCache, ocr_cache
+from app.utils.layout import LAYOUT_HEADINGS_KEY, PAGE_NUMBER_COMMENT, apply_layout
+from app.utils.metrics import PAGES, SOURCE_BYTES, stage
+from app.utils.single_flight import SingleFlight
+
+CacheMode = Literal["use", "bypass"]
 
 
 class OCRService:
 
-    def __init__(self) -> None:
-        self.client = AzureDIClient()
+    def __init__(self, cache: OCRResultCache) -> None:
+        self.client = AsyncAzureDIClient()
+        self.downloader = DownloadClient()
+        self.cache = cache
+        self.flights = SingleFlight()
 
-    def process(
+    async def process(
         self,
-        source: Union[str, bytes],
+        source: Union[str, bytes, DownloadedSource],
         extra_meta: dict | None = None  ,
+        cache_mode: CacheMode = "use",
     ) -> List[Document]:
-        
-        # Process
-        docs = self.client.load(source)
 
-        # Remove markers
-        docs = self._remove_markers(docs)
+        # Concurrent requests for the same URL share one download and analysis;
+        # only the per-request metadata below is built separately.
+        if isinstance(source, str) and source.startswith(("http://", "https://")):
+            fetched, docs = await self.flights.do(
+                f"url:{cache_mode}:{self._normalize_url(source)}",
+                lambda: self._fetch_and_load(source, cache_mode),
+            )
+        else:
+            fetched, docs = await self._fetch_and_load(source, cache_mode)
 
         if not docs:
             return []
 
-        base_meta = self._build_base_metadata(source, docs, extra_meta)
-        enriched = [
-            Document(
-                page_content=d.page_content,
-                metadata={**base_meta, "page_number": i + 1},
-            )
-            for i, d in enumerate(docs)
-        ]
+        base_meta = self._build_base_metadata(source, fetched, docs, extra_meta)
+        enriched: List[Document] = []
+        for i, d in enumerate(docs):
+            metadata = {**base_meta, "page_number": d.metadata.get("page") or i + 1}
+            if LAYOUT_HEADINGS_KEY in d.metadata:
+                # Consumed by the chunking service instead of re-detecting headings
+                metadata[LAYOUT_HEADINGS_KEY] = d.metadata[LAYOUT_HEADINGS_KEY]
+            enriched.append(Document(page_content=d.page_content, metadata=metadata))
         return enriched
 
+    async def _fetch_and_load(
+        self,
+        source: Union[str, bytes, DownloadedSource],
+        cache_mode: CacheMode,
+    ) -> Tuple[DownloadedSource, List[Document]]:
+        # Fetch and hash the source once, then hand the same bytes to Azure.
+        # Different sources with identical content coalesce on the checksum.
+        with stage("download"):
+            fetched = await self._open_source(source)
+
+        def load() -> Awaitable[List[Document]]:
+            # The shared task may outlive this caller, so it owns the spool
+            fetched.claim()
+            return self._load_and_close(fetched, cache_mode)
+
+        try:
+            docs = await self.flights.do(f"sha256:{cache_mode}:{fetched.checksum_sha256}", load)
+        finally:
+            # Not claimed when another caller's copy was analyzed
+            fetched.release()
+        return fetched, docs
+
+    async def _load_and_close(self, fetched: DownloadedSource, cache_mode: CacheMode) -> List[Document]:
+        try:
+            return await self._load_pages(fetched, cache_mode)
+        finally:
+            fetched.close()
+
+    async def _load_pages(self, fetched: DownloadedSource, cache_mode: CacheMode) -> List[Document]:
+        """
+        Return the cleaned pages of a document, from cache when possible.
+
+        ``bypass`` skips the lookup but still stores the fresh result, so it
+        can be used to force a re-OCR that refreshes the cache.
+        """
+        use_cache = settings.ocr_cache_enabled
+        layout = settings.azure_di_sectioning == "layout"
+        key = self.cache.make_key(
+            fetched.checksum_sha256,
+            settings.azure_di_api_model,
+            f"{settings.azure_di_mode}+layout" if layout else settings.azure_di_mode,
+        )
+        if use_cache and cache_mode != "bypass":
+            with stage("ocr_cache"):
+                cached = await self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        # Process
+        with stage("azure_di"):
+            docs = await self.client.load(fetched.source)
+        PAGES.inc(len(docs))
+        SOURCE_BYTES.inc(fetched.size or 0)
+
+        # Remove markers (and page furniture, using the layout when available)
+        with stage("remove_markers"):
+            if layout:
+                docs = self._apply_layout(docs)
+            docs = self._remove_markers(docs)
+
+        if use_cache:
+            with stage("ocr_cache"):
+                await self.cache.put(key, docs)
+        return docs
+
+    async def close(self) -> None:
+        await self.client.close()
+        await self.downloader.close()
+
+    async def _open_source(self, source: Union[str, bytes, DownloadedSource]) -> DownloadedSource:
+        # Upload already spooled and hashed while it was received
+        if isinstance(source, DownloadedSource):
+            return source
+
+        # Remote URL: single streamed download into a bounded spool
+        if isinstance(source, str) and source.startswith(("http://", "https://")):
+            return await self.downloader.fetch(source)
+
+        if isinstance(source, bytes):
+            return DownloadedSource(
+                checksum_sha256=hashlib.sha256(source).hexdigest(),
+                file_name=guess_file_name(source),
+                content_type=None,
+                size=len(source),
+                data=source,
+            )
+
+        # Local file
+        p = Path(source)
+        checksum = await asyncio.to_thread(self._hash_file, p)
+        return DownloadedSource(
+            checksum_sha256=checksum,
+            file_name=guess_file_name(source),
+            content_type=mimetypes.guess_type(p.name)[0],
+            size=p.stat().st_size,
+            path=str(p),
+        )
+
     def _build_base_metadata(
         self,
-        source: Union[str, bytes],
+        source: Union[str, bytes, DownloadedSource],
+        fetched: DownloadedSource,
         docs: List[Document],
         extra_meta: dict | None,
     ) -> dict:
-        filename = self._guess_file_name(source)
-        checksum = self._compute_checksum(source)
         page_count = len(docs)
 
         # Determine type and record original source if applicable
@@ -57,15 +170,20 @@ class OCRService:
         elif isinstance(source, str):
             source_type = "file"
             source_value = str(Path(source))     # absolute/local path
+        elif isinstance(source, DownloadedSource):
+            source_type = "upload"
+            source_value = fetched.file_name     # names the chunk ids
         else:
             source_type = "bytes"
             source_value = None
 
         meta = {
-            "file_name": filename,
+            "file_name": fetched.file_name,
             "page_count": page_count,
             "processed_at": datetime.now(timezone.utc).isoformat(),
-            "checksum_sha256": checksum,
+            "checksum_sha256": fetched.checksum_sha256,
+            "content_type": fetched.content_type,
+            "file_size": fetched.size,
             "source_type": source_type,
             "source": source_value
         }
@@ -76,45 +194,42 @@ class OCRService:
         return meta
 
     @staticmethod
-    def _guess_file_name(source: Union[str, bytes]) -> str:
-        if isinstance(source, bytes):
-            return "uploaded_bytes"
-        if source.startswith(("http://", "https://")):
-            return Path(urlparse(source).path).name or "downloaded_file"
-        return Path(source).name
+    def _normalize_url(url: str) -> str:
+        parts = urlsplit(url)
+        netloc = parts.netloc.lower()
+        if (parts.scheme, parts.port) in (("http", 80), ("https", 443)):
+            netloc = netloc.rsplit(":", 1)[0]
+        return urlunsplit((parts.scheme.lower(), netloc, parts.path or "/", parts.query, ""))
 
     @staticmethod
-    def _compute_checksum(source: Union[str, bytes]) -> str | None:
+    def _hash_file(p: Path) -> str:
         h = hashlib.sha256()
+        with p.open("rb") as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b""):
+                h.update(chunk)
+        return h.hexdigest()
 
-        if isinstance(source, bytes):
-            h.update(source)
-            return h.hexdigest()
-
-        # Remote URL
-        if isinstance(source, str) and source.startswith(("http://", "https://")):
-            with requests.get(source, stream=True) as r:
-                r.raise_for_status()
-                for chunk in r.iter_content(chunk_size=8192):
-                    h.update(chunk)
-            return h.hexdigest()
-
-        # Local file
-        p = Path(source)
-        if p.exists():
-            with p.open("rb") as f:
-                for chunk in iter(lambda: f.read(8192), b""):
-                    h.update(chunk)
-            return h.hexdigest()
-        
-        return None
+    @staticmethod
+    def _apply_layout(docs: List[Document]) -> List[Document]:
+        """
+        Clean documents with their DI layout paragraphs: page headers, footers
+        and numbers are dropped and headings are recorded for sectioning.
+        Documents without layout (page mode) are left to the regex path.
+        """
+        for d in docs:
+            paragraphs = d.metadata.pop("layout", None)
+            if paragraphs is None:
+                continue
+            d.page_content, heads = apply_layout(d.page_content, paragraphs)
+            if heads:
+                d.metadata[LAYOUT_HEADINGS_KEY] = heads
+        return docs
 
     def _remove_markers(self, docs: List[Document]) -> List[Document]:
         cleaned: List[Document] = []
-        pattern = re.compile(r'<!--\s*PageNumber="[^"]*"\s*-->')
 
         for d in docs:
-            text = pattern.sub("", d.page_content).strip()
+            text = PAGE_NUMBER_COMMENT.sub("", d.page_content).strip()
             # Keep the doc only if something remains
             if text:
                 d.page_content = text
@@ -122,4 +237,4 @@ class OCRService:
 
         return cleaned
 
-ocr_service = OCRService()
\ No newline at end of file
+ocr_service = OCRService(ocr_cache)
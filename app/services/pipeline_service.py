@@ -0,0 +1,329 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, List, Sequence, Tuple, Union
+
+from langchain_core.documents import Document
+from app.api.schemas.ocr_chunking import (
+    ChunkDiff,
+    ChunkingOptions,
+    ChunkStreamSummary,
+    OCRChunk,
+    OCRChunkingRequest,
+    OCRChunkingResponse,
+    OCRChunkRecord,
+    OCRUploadRequest,
+)
+from app.clients.download_client import DownloadedSource
+from app.services.chunk_export import ExportFormat, chunk_table, encode_table
+from app.services.chunk_spans import ChunkSpan
+from app.services.chunk_store import chunk_store
+from app.services.chunking_service import chunk_service
+from app.services.dedup_service import dedup_service
+from app.services.ocr_service import ocr_service
+from app.services.revision_service import revision_service
+from app.services.splitter_cache import SplitterConfig, make_config
+from app.utils.metrics import CHUNKS_PER_DOCUMENT, stage
+from app.config.settings import settings
+from app.utils.webhook_client import webhook_dispatcher
+
+logger = logging.getLogger(__name__)
+
+
+class NoTextExtractedError(ValueError):
+    """Raised when OCR returns no usable text for a document."""
+
+
+class PipelineService:
+    """OCR + chunking + webhooks, shared by the HTTP handlers and the job workers."""
+
+    async def ocr(
+        self,
+        payload: OCRChunkingRequest | OCRUploadRequest,
+        upload: DownloadedSource | None = None,
+    ) -> List[Document]:
+        """OCR the payload's URL, or ``upload`` (a received body, closed once analyzed)."""
+        if upload is None:
+            if not isinstance(payload, OCRChunkingRequest):
+                raise TypeError("An upload request needs the received body.")
+            source: DownloadedSource | str = str(payload.url)
+        else:
+            source = upload
+        # Step 1: OCR to obtain a list of LangChain Document objects with metadata
+        docs = await ocr_service.process(
+            source=source,
+            extra_meta=payload.extra_meta or {},
+            cache_mode=payload.cache,
+        )
+        if not docs:
+            raise NoTextExtractedError("No text extracted from the document.")
+        return docs
+
+    async def ocr_chunking(
+        self,
+        payload: OCRChunkingRequest | OCRUploadRequest,
+        upload: DownloadedSource | None = None,
+    ) -> OCRChunkingResponse:
+        docs = await self.ocr(payload, upload)
+
+        # Step 2: Chunking the documents
+        chunks, diff, duplicates = await self.split(
+            payload.document_id, docs, payload.chunking, payload.incremental, payload.dedup
+        )
+
+        # Step 3: Convert to schema-friendly objects
+        with stage("serialize"):
+            chunk_items = [
+                OCRChunk(content=c.text, metadata=c.metadata()) for c in chunks
+            ]
+        logger.debug("Chunked %s into %d chunks", payload.document_id, len(chunk_items))
+
+        self._fire_webhooks(payload, chunk_items, diff)
+
+        return OCRChunkingResponse(
+            document_id=payload.document_id, chunks=chunk_items, diff=diff, duplicates=duplicates
+        )
+
+    async def ocr_chunking_export(
+        self,
+        payload: OCRChunkingRequest | OCRUploadRequest,
+        fmt: ExportFormat,
+        upload: DownloadedSource | None = None,
+    ) -> bytes:
+        """``ocr_chunking`` serialized as an Arrow IPC stream or a Parquet file."""
+        docs = await self.ocr(payload, upload)
+        chunks, diff, _ = await self.split(
+            payload.document_id, docs, payload.chunking, payload.incremental, payload.dedup
+        )
+        if payload.webhooks:
+            self._fire_webhooks(
+                payload, [OCRChunk(content=c.text, metadata=c.metadata()) for c in chunks], diff
+            )
+        return await self.export(payload.document_id, chunks, diff, fmt)
+
+    @staticmethod
+    async def export(
+        document_id: str,
+        chunks: List[ChunkSpan],
+        diff: ChunkDiff | None,
+        fmt: ExportFormat,
+    ) -> bytes:
+        """Columnar encoding of a chunk list, built off the event loop."""
+        with stage("serialize"):
+            return await asyncio.to_thread(
+                lambda: encode_table(chunk_table(document_id, chunks, diff), fmt)
+            )
+
+    async def split(
+        self,
+        document_id: str,
+        docs: List[Document],
+        options: ChunkingOptions | None = None,
+        incremental: bool = False,
+        dedup: str | None = None,
+    ) -> Tuple[List[ChunkSpan], ChunkDiff | None, Dict[str, str] | None]:
+        """
+        Chunk, then diff against the previous version and dedup when asked to.
+        The resulting chunks replace the document's entry in the chunk store.
+        """
+        config = self.splitter_config(options)
+        diff: ChunkDiff | None = None
+        if incremental:
+            # Dedup runs within the revision, so its time is part of "chunking" too
+            with stage("chunking"):
+                chunks, diff, duplicates = await self._rechunk(document_id, docs, config, dedup)
+        else:
+            with stage("chunking"):
+                chunks = await chunk_service.asplit_spans(docs, config)
+            chunks, duplicates = await self._dedup(document_id, chunks, dedup)
+        with stage("chunk_store"):
+            await chunk_store.put(document_id, chunks)
+        CHUNKS_PER_DOCUMENT.observe(len(chunks))
+        return chunks, diff, duplicates
+
+    async def stream_chunks(
+        self,
+        document_id: str,
+        docs: List[Document],
+        payload: OCRChunkingRequest | OCRUploadRequest | None = None,
+        options: ChunkingOptions | None = None,
+        incremental: bool = False,
+        dedup: str | None = None,
+    ) -> AsyncIterator[Union[OCRChunkRecord, ChunkStreamSummary]]:
+        """
+        Yield chunk records section by section, then a trailing summary.
+
+        Chunking runs off the event loop (threadpool or process pool). Chunks are
+        only retained, as offset spans, when webhooks need the full list at the end.
+        ``options``, ``incremental`` and ``dedup`` default to the payload's
+        settings; an incremental stream diffs first and reports the diff in
+        the summary. Dedup and the chunk store write run per section batch.
+        """
+        if payload is not None:
+            options = options or payload.chunking
+            incremental = incremental or payload.incremental
+            dedup = dedup or payload.dedup
+        config = self.splitter_config(options)
+        diff: ChunkDiff | None = None
+        duplicates: Dict[str, str] | None = None
+        if incremental:
+            # Deduplicated before diffing, so the diff only lists streamed chunks
+            chunks, diff, duplicates = await self._rechunk(document_id, docs, config, dedup)
+            for c in chunks:
+                # Reported in the summary, as for other streams
+                c.num_chunks = None
+            batches = _one_batch(chunks)
+        else:
+            batches = chunk_service.aiter_split_spans(docs, config)
+
+        keep = payload is not None and payload.webhooks is not None
+        kept: List[ChunkSpan] = []
+        totals: Dict[str, int] = defaultdict(int)
+        first = True
+        async for batch in batches:
+            if not incremental:
+                batch, found = await self._dedup(document_id, batch, dedup, reset=first)
+                if found is not None:
+                    duplicates = {**(duplicates or {}), **found}
+            with stage("chunk_store"):
+                await chunk_store.put(document_id, batch, reset=first)
+            first = False
+            for c in batch:
+                totals[c.source or ""] += 1
+                yield OCRChunkRecord(content=c.text, metadata=c.metadata())
+            if keep:
+                kept.extend(batch)
+        if first:
+            # Nothing to chunk: still replace the stored version
+            await chunk_store.put(document_id, [])
+        await chunk_store.finish(document_id, totals)
+        CHUNKS_PER_DOCUMENT.observe(sum(totals.values()))
+
+        if keep and payload is not None:
+            for c in kept:
+                src = c.source
+                c.num_chunks = totals[src] if src else 1
+            self._fire_webhooks(
+                payload, [OCRChunk(content=c.text, metadata=c.metadata()) for c in kept], diff
+            )
+
+        yield ChunkStreamSummary(
+            document_id=document_id,
+            num_chunks=sum(totals.values()),
+            num_chunks_by_source={k: v for k, v in totals.items() if k},
+            diff=diff,
+            duplicates=duplicates,
+        )
+
+    async def ocr_chunking_many(
+        self,
+        payloads: Sequence[OCRChunkingRequest],
+        concurrency: int,
+    ) -> AsyncIterator[Tuple[int, Union[OCRChunkingResponse, Exception]]]:
+        """
+        Run many OCR-chunking requests concurrently, at most ``concurrency`` at
+        a time, yielding ``(index, response_or_error)`` as each one completes.
+        """
+        sem = asyncio.Semaphore(concurrency)
+
+        async def run(i: int, payload: OCRChunkingRequest) -> Tuple[int, Union[OCRChunkingResponse, Exception]]:
+            async with sem:
+                try:
+                    return i, await self.ocr_chunking(payload)
+                except Exception as exc:
+                    return i, exc
+
+        tasks = [asyncio.create_task(run(i, p)) for i, p in enumerate(payloads)]
+        try:
+            for fut in asyncio.as_completed(tasks):
+                yield await fut
+        finally:
+            # Client went away or the consumer stopped early
+            for t in tasks:
+                t.cancel()
+
+    async def _rechunk(
+        self,
+        document_id: str,
+        docs: List[Document],
+        config: SplitterConfig | None,
+        dedup: str | None,
+    ) -> Tuple[List[ChunkSpan], ChunkDiff, Dict[str, str] | None]:
+        """Next revision of the document, deduplicated before it is diffed."""
+        duplicates: Dict[str, str] | None = None
+
+        async def keep(chunks: List[ChunkSpan]) -> List[ChunkSpan]:
+            nonlocal duplicates
+            chunks, duplicates = await self._dedup(document_id, chunks, dedup)
+            return chunks
+
+        chunks, diff = await revision_service.rechunk(document_id, docs, config, keep)
+        return chunks, diff, duplicates
+
+    @staticmethod
+    async def _dedup(
+        document_id: str,
+        chunks: List[ChunkSpan],
+        mode: str | None,
+        reset: bool = True,
+    ) -> Tuple[List[ChunkSpan], Dict[str, str] | None]:
+        """Flag duplicates ("tag") or also drop them ("drop"); returns chunk_id -> canonical chunk_id."""
+        mode = mode or settings.dedup_mode
+        if mode == "off":
+            return chunks, None
+        with stage("dedup"):
+            await dedup_service.mark(document_id, chunks, reset)
+        duplicates = {c.chunk_id: c.duplicate_of[0] for c in chunks if c.duplicate_of is not None}
+        if mode == "drop":
+            chunks = [c for c in chunks if c.duplicate_of is None]
+        return chunks, duplicates
+
+    @staticmethod
+    def splitter_config(options: ChunkingOptions | None) -> SplitterConfig | None:
+        """Splitter config for per-request options; None keeps the default splitter."""
+        if options is None:
+            return None
+        return make_config(
+            options.chunk_size, options.chunk_overlap, options.separators, options.length_unit
+        )
+
+    @staticmethod
+    def _fire_webhooks(
+        payload: OCRChunkingRequest | OCRUploadRequest,
+        chunks: List[OCRChunk],
+        diff: ChunkDiff | None = None,
+    ) -> None:
+        # Queue callbacks on the dispatcher if provided
+        if not payload.webhooks:
+            return
+        auth = payload.webhooks.auth_header
+        meta = chunks[0].metadata if chunks else {}
+        if payload.webhooks.metadata:
+            body: Dict[str, Any] = {"metadata": meta}
+            if diff is not None:
+                body["diff"] = diff.model_dump()
+            webhook_dispatcher.submit(str(payload.webhooks.metadata), body, auth)
+        if payload.webhooks.toc:
+            webhook_dispatcher.submit(str(payload.webhooks.toc), {"toc": []}, auth)
+        if payload.webhooks.section_content:
+            if diff is not None:
+                # Incremental: only chunks with new content need storing/embedding
+                added = set(diff.added)
+                chunks = [c for c in chunks if c.metadata.get("chunk_id") in added]
+            items = [
+                {"section_id": c.metadata.get("chunk_id"), "content": c.content, "metadata": c.metadata}
+                for c in chunks
+            ]
+            webhook_dispatcher.submit_sections(
+                str(payload.webhooks.section_content),
+                items,
+                auth,
+                batch_size=settings.webhook_sections_batch_size,
+            )
+
+
+async def _one_batch(chunks: List[ChunkSpan]) -> AsyncIterator[List[ChunkSpan]]:
+    yield chunks
+
+
+pipeline_service = PipelineService()
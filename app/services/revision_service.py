@@ -0,0 +1,206 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from langchain_core.documents import Document
+from app.api.schemas.ocr_chunking import ChunkDiff
+from app.config.settings import settings
+from app.services.chunk_spans import ChunkSpan
+from app.services.chunking_service import chunk_service
+from app.services.splitter_cache import SplitterConfig
+
+# [section_hash, [[start_index, length], ...], [chunk_id, ...]] per section, in order;
+# the chunk_id is None for chunks that were dropped as duplicates
+StoredSections = List[Tuple[str, List[Tuple[int, int]], List[Optional[str]]]]
+
+# Filters a version's chunks before they are diffed, e.g. duplicate dropping
+ChunkFilter = Callable[[List[ChunkSpan]], Awaitable[List[ChunkSpan]]]
+
+# Times a version is recomputed when another worker stored one first
+_SAVE_ATTEMPTS = 3
+
+
+class RevisionConflictError(RuntimeError):
+    """Raised when concurrent ingests of one document_id keep replacing each other's version."""
+
+
+class RevisionService:
+    """
+    Incremental re-chunking of documents that are re-ingested under the same
+    ``document_id``.
+
+    The per-section hashes and chunk offsets of the last version are kept in
+    SQLite. A new version only re-splits sections whose text (or splitter
+    config) changed, and its chunks are diffed against the previous ones by
+    content, so callers can re-embed just the added chunks.
+
+    Versions of one document are computed one at a time: runs in this
+    process wait on a per-document lock, and a version is only stored if
+    the previous one is still current, so a run racing another worker
+    recomputes its diff against the version that worker stored.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # Per-document locks, with the number of runs holding or awaiting each
+        self._documents: Dict[str, Tuple[asyncio.Lock, List[int]]] = {}
+
+    async def rechunk(
+        self,
+        document_id: str,
+        docs: List[Document],
+        config: Optional[SplitterConfig] = None,
+        keep: Optional[ChunkFilter] = None,
+    ) -> Tuple[List[ChunkSpan], ChunkDiff]:
+        """
+        Chunk ``docs`` as the next version of ``document_id``; returns the
+        chunks and the diff. ``keep`` selects the chunks that are returned and
+        diffed; the others are neither added nor unchanged.
+        """
+        lock, users = self._documents.setdefault(document_id, (asyncio.Lock(), [0]))
+        users[0] += 1
+        try:
+            async with lock:
+                for _ in range(_SAVE_ATTEMPTS):
+                    result = await self._next_version(document_id, docs, config, keep)
+                    if result is not None:
+                        return result
+        finally:
+            users[0] -= 1
+            if not users[0]:
+                del self._documents[document_id]
+        raise RevisionConflictError(
+            f"Document {document_id} was re-ingested concurrently; no version could be stored."
+        )
+
+    async def _next_version(
+        self,
+        document_id: str,
+        docs: List[Document],
+        config: Optional[SplitterConfig],
+        keep: Optional[ChunkFilter],
+    ) -> Optional[Tuple[List[ChunkSpan], ChunkDiff]]:
+        """One attempt of ``rechunk``; None if another worker stored a version meanwhile."""
+        previous = await asyncio.to_thread(self._load, document_id)
+        version, old_sections = previous if previous is not None else (0, [])
+        known = {digest: [(o[0], o[1]) for o in offsets] for digest, offsets, _ in old_sections}
+
+        sections = await asyncio.to_thread(chunk_service.split_by_section, docs, config, known)
+        chunks = [c for _, section_chunks in sections for c in section_chunks]
+        if keep is not None:
+            chunks = await keep(chunks)
+        kept = {id(c) for c in chunks}
+        reused = sum(1 for digest, _ in sections if digest in known)
+        diff = ChunkDiff(
+            version=version + 1,
+            sections_reused=reused,
+            sections_split=len(sections) - reused,
+            **self._diff(old_sections, sections, kept),
+        )
+
+        stored: StoredSections = [
+            (
+                digest,
+                [(c.start_index, c.length) for c in section_chunks],
+                [c.chunk_id if id(c) in kept else None for c in section_chunks],
+            )
+            for digest, section_chunks in sections
+        ]
+        if not await asyncio.to_thread(self._save, document_id, version, stored):
+            return None
+        return chunks, diff
+
+    @staticmethod
+    def _diff(
+        old_sections: StoredSections,
+        sections: List[Tuple[str, List[ChunkSpan]]],
+        kept: Set[int],
+    ) -> Dict[str, Any]:
+        """
+        Match chunks by content key (section hash + position in the section).
+        Unchanged chunks whose chunk_id was renumbered are listed in ``moved``.
+        Only chunks whose id() is in ``kept`` count, on either side.
+        """
+        previous: Dict[str, List[str]] = defaultdict(list)
+        for digest, _, chunk_ids in old_sections:
+            for i, chunk_id in enumerate(chunk_ids):
+                if chunk_id is not None:
+                    previous[f"{digest}:{i}"].append(chunk_id)
+
+        added: List[str] = []
+        unchanged: List[str] = []
+        moved: Dict[str, str] = {}
+        for digest, chunks in sections:
+            for i, c in enumerate(chunks):
+                if id(c) not in kept:
+                    continue
+                old_ids = previous.get(f"{digest}:{i}")
+                if not old_ids:
+                    added.append(c.chunk_id)
+                    continue
+                old_id = old_ids.pop(0)
+                unchanged.append(c.chunk_id)
+                if old_id != c.chunk_id:
+                    moved[old_id] = c.chunk_id
+
+        removed = [chunk_id for ids in previous.values() for chunk_id in ids]
+        return {"added": added, "removed": removed, "unchanged": unchanged, "moved": moved}
+
+    # ----------------- SQLite (runs in worker threads) -----------------
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS document_sections ("
+                " document_id TEXT PRIMARY KEY,"
+                " version INTEGER NOT NULL,"
+                " sections BLOB NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _load(self, document_id: str) -> Optional[Tuple[int, StoredSections]]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT version, sections FROM document_sections WHERE document_id = ?",
+                (document_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(zlib.decompress(row[1]))
+
+    def _save(self, document_id: str, previous: int, sections: StoredSections) -> bool:
+        """Store version ``previous + 1``; False if ``previous`` is no longer the current version."""
+        blob = zlib.compress(json.dumps(sections).encode("utf-8"))
+        with self._lock:
+            conn = self._connect()
+            if previous == 0:
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO document_sections (document_id, version, sections, updated_at)"
+                    " VALUES (?, 1, ?, ?)",
+                    (document_id, blob, time.time()),
+                )
+            else:
+                cur = conn.execute(
+                    "UPDATE document_sections SET version = ?, sections = ?, updated_at = ?"
+                    " WHERE document_id = ? AND version = ?",
+                    (previous + 1, blob, time.time(), document_id, previous),
+                )
+            conn.commit()
+            return cur.rowcount == 1
+
+
+revision_service = RevisionService(settings.revision_db_path)
@@ -0,0 +1,60 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
+
+from app.config.settings import settings
+from app.utils.tokenizers import cached_length_function, load_tokenizer
+
+if TYPE_CHECKING:
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+# (chunk_size, chunk_overlap, separators, length unit); None separators = the splitter's defaults
+SplitterConfig = Tuple[int, int, Optional[Tuple[str, ...]], str]
+
+
+def make_config(
+    chunk_size: Optional[int] = None,
+    chunk_overlap: Optional[int] = None,
+    separators: Optional[List[str]] = None,
+    length_unit: Optional[str] = None,
+) -> SplitterConfig:
+    """Resolve per-request chunking options against the service defaults."""
+    if separators is None:
+        separators = settings.chunk_separators
+    return (
+        chunk_size if chunk_size is not None else settings.chunk_size,
+        chunk_overlap if chunk_overlap is not None else settings.chunk_overlap,
+        tuple(separators) if separators else None,
+        length_unit or settings.chunk_length_unit,
+    )
+
+
+@lru_cache(maxsize=None)
+def token_length_function() -> Callable[[str], int]:
+    """Memoized token counter for the configured tokenizer, shared by all token-mode splitters."""
+    if not settings.chunk_tokenizer_path:
+        raise ValueError("chunk_tokenizer_path must be set for token-budget chunking.")
+    tokenizer = load_tokenizer(settings.chunk_tokenizer_path, settings.chunk_tokenizer_lowercase)
+    return cached_length_function(tokenizer, settings.chunk_token_cache_size)
+
+
+@lru_cache(maxsize=settings.chunk_splitter_cache_size)
+def get_splitter(config: SplitterConfig) -> "RecursiveCharacterTextSplitter":
+    """
+    Splitter for a config, built once and kept in a bounded LRU. Separator
+    patterns are compiled on first use and then served from ``re``'s cache,
+    so reusing the splitter reuses them as well.
+    """
+    # Imported on first use: langchain_text_splitters pulls in most of langchain_core
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    chunk_size, chunk_overlap, separators, length_unit = config
+    if length_unit not in ("chars", "tokens"):
+        raise ValueError(f"Invalid chunk length unit: {length_unit}")
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=list(separators) if separators else None,
+        length_function=token_length_function() if length_unit == "tokens" else len,
+        add_start_index=True,
+        is_separator_regex=False,
+    )
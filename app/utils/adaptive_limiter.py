@@ -0,0 +1,85 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limiter for calls to a rate-limited backend.
+
+    The limit grows by roughly one slot per window of successful calls and is
+    cut multiplicatively whenever the backend throttles. A ``Retry-After``
+    from the backend pauses every caller in the process until it expires.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        initial_limit: Optional[int] = None,
+        backoff_ratio: float = 0.5,
+    ) -> None:
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.backoff_ratio = backoff_ratio
+        self.limit = float(initial_limit or max_limit)
+        self.in_flight = 0
+        self.waiting = 0
+        self.throttled = 0
+        self.completed = 0
+        self._paused_until = 0.0
+        self._cond = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self.acquire()
+        try:
+            yield
+        finally:
+            await self.release()
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            self.waiting += 1
+            try:
+                while True:
+                    pause = self._paused_until - time.monotonic()
+                    if pause > 0:
+                        try:
+                            await asyncio.wait_for(self._cond.wait(), pause)
+                        except asyncio.TimeoutError:
+                            pass
+                        continue
+                    if self.in_flight < int(self.limit):
+                        break
+                    await self._cond.wait()
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+
+    async def release(self) -> None:
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self) -> None:
+        self.completed += 1
+        self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        self.throttled += 1
+        self.limit = max(float(self.min_limit), self.limit * self.backoff_ratio)
+        if retry_after:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "throttled": self.throttled,
+            "completed": self.completed,
+            "paused_for": max(0.0, round(self._paused_until - time.monotonic(), 3)),
+        }
@@ -0,0 +1,59 @@
+import hashlib
+import re
+import unicodedata
+from typing import List
+
+_WORDS = re.compile(r"[\w\u0300-\u036f]+", re.UNICODE)
+_SPACES = re.compile(r"\s+", re.UNICODE)
+
+# SimHash of fewer features than this is too unstable to call anything a near-duplicate
+MIN_SIMHASH_FEATURES = 8
+
+
+def normalize(text: str) -> str:
+    """NFC, case-folded, whitespace-collapsed form used for exact duplicate hashing."""
+    return _SPACES.sub(" ", unicodedata.normalize("NFC", text).casefold()).strip()
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(normalize(text).encode("utf-8")).hexdigest()
+
+
+def simhash(text: str) -> int:
+    """
+    64-bit SimHash over word unigrams and bigrams of the normalized text.
+    Returns 0 when the text has too few features to fingerprint.
+    """
+    words = _WORDS.findall(normalize(text))
+    features: List[str] = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    if len(features) < MIN_SIMHASH_FEATURES:
+        return 0
+    import numpy as np
+
+    hashes = np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "little")
+            for f in features
+        ),
+        dtype=np.uint64,
+        count=len(features),
+    )
+    # One row of 64 bits per feature; a bit is set when most features set it
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 > len(features)
+    return int.from_bytes(np.packbits(votes, bitorder="little").tobytes(), "little")
+
+
+def simhash_bands(value: int, bands: int) -> List[int]:
+    """
+    Split a 64-bit SimHash into ``bands`` equal bit ranges (leftover high bits
+    are ignored). Two hashes within Hamming distance ``bands - 1`` share at
+    least one band exactly.
+    """
+    width = 64 // bands
+    mask = (1 << width) - 1
+    return [(value >> (i * width)) & mask for i in range(bands)]
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
@@ -0,0 +1,104 @@
+import bisect
+import re
+from typing import Any, Iterable, List, Sequence, Tuple
+
+# Paragraph roles of the prebuilt-layout model that sectioning cares about
+HEADING_ROLES = frozenset({"title", "sectionHeading"})
+FURNITURE_ROLES = frozenset({"pageHeader", "pageFooter", "pageNumber"})
+
+# Page metadata key carrying the headings found from the layout, as
+# (start, end, title) triples in find_headings format
+LAYOUT_HEADINGS_KEY = "layout_headings"
+
+PAGE_NUMBER_COMMENT = re.compile(r'<!--\s*PageNumber="[^"]*"\s*-->')
+
+# (offset, length, role, content) of one structural paragraph in the result content
+LayoutParagraph = Tuple[int, int, str, str]
+
+
+def layout_paragraphs(result: Any, shift: int = 0) -> List[LayoutParagraph]:
+    """
+    Heading and page furniture paragraphs of an AnalyzeResult, with offsets
+    moved by ``shift`` (for results merged into a longer content string).
+    Offsets are only meaningful with ``string_index_type="unicodeCodePoint"``.
+    """
+    out: List[LayoutParagraph] = []
+    for p in getattr(result, "paragraphs", None) or []:
+        role = getattr(p.role, "value", p.role)
+        if (role not in HEADING_ROLES and role not in FURNITURE_ROLES) or not p.spans:
+            continue
+        start = min(s.offset for s in p.spans)
+        end = max(s.offset + s.length for s in p.spans)
+        out.append((shift + start, end - start, role, p.content or ""))
+    return out
+
+
+def _line_range(text: str, start: int, end: int) -> Tuple[int, int]:
+    """The full lines covering ``text[start:end]``, trailing newline included."""
+    line_start = text.rfind("\n", 0, start) + 1
+    nl = text.find("\n", max(start, end - 1))
+    return line_start, len(text) if nl < 0 else nl + 1
+
+
+def _merge(ranges: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def apply_layout(
+    text: str, paragraphs: Sequence[LayoutParagraph]
+) -> Tuple[str, List[Tuple[int, int, str]]]:
+    """
+    Drop page headers, footers and page numbers (whole lines) and PageNumber
+    comments from ``text``, and return the stripped text with the layout
+    headings mapped onto it as ``(start, end, title)`` line ranges.
+    """
+    removed = _merge(
+        [_line_range(text, off, off + length) for off, length, role, _ in paragraphs if role in FURNITURE_ROLES]
+        + [m.span() for m in PAGE_NUMBER_COMMENT.finditer(text)]
+    )
+    starts = [s for s, _ in removed]
+    # Characters removed before each removed range, to map old offsets to new ones
+    before: List[int] = []
+    total = 0
+    for s, e in removed:
+        before.append(total)
+        total += e - s
+
+    def inside(pos: int) -> bool:
+        i = bisect.bisect_right(starts, pos) - 1
+        return i >= 0 and pos < removed[i][1]
+
+    def moved(pos: int) -> int:
+        i = bisect.bisect_right(starts, pos) - 1
+        if i < 0:
+            return pos
+        s, e = removed[i]
+        return pos - before[i] - (min(pos, e) - s)
+
+    kept: List[str] = []
+    pos = 0
+    for s, e in removed:
+        kept.append(text[pos:s])
+        pos = e
+    kept.append(text[pos:])
+    cleaned = "".join(kept)
+    lead = len(cleaned) - len(cleaned.lstrip())
+    cleaned = cleaned.strip()
+
+    heads: List[Tuple[int, int, str]] = []
+    for off, length, role, content in sorted(paragraphs):
+        title = content.strip()
+        if role not in HEADING_ROLES or not title or inside(off):
+            continue
+        line_start, line_end = _line_range(text, off, off + length)
+        start = max(0, moved(line_start) - lead)
+        end = min(len(cleaned), moved(line_end) - lead)
+        if start < end and (not heads or start > heads[-1][0]):
+            heads.append((start, end, title))
+    return cleaned, heads
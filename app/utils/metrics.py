@@ -0,0 +1,156 @@
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+STAGE_SECONDS = Histogram(
+    "ocr_chunking_stage_seconds",
+    "Time spent per pipeline stage, summed over one request or job",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+REQUEST_SECONDS = Histogram(
+    "ocr_chunking_http_request_seconds",
+    "HTTP request latency until the response is complete",
+    ["method", "route", "status"],
+    buckets=STAGE_BUCKETS,
+)
+IN_FLIGHT = Gauge(
+    "ocr_chunking_http_requests_in_flight",
+    "HTTP requests being handled",
+    multiprocess_mode="livesum",
+)
+PAGES = Counter("ocr_chunking_pages_total", "Pages returned by OCR")
+SOURCE_BYTES = Counter("ocr_chunking_source_bytes_total", "Bytes of source documents OCR'd")
+CHUNKS_PER_DOCUMENT = Histogram(
+    "ocr_chunking_chunks_per_document",
+    "Chunks produced per document",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 50000),
+)
+AZURE_RETRIES = Counter(
+    "ocr_chunking_azure_di_retries_total",
+    "Azure Document Intelligence calls retried, by cause",
+    ["reason"],
+)
+# "liveall" exports one series per live worker, labelled with its pid
+STARTUP_SECONDS = Gauge(
+    "ocr_chunking_startup_seconds",
+    "Start-up time of each server process by phase ('boot' = until ready)",
+    ["phase"],
+    multiprocess_mode="liveall",
+)
+
+# Stage durations of the current request or job, summed per stage
+_stages: ContextVar[Optional[Dict[str, float]]] = ContextVar("stages", default=None)
+
+
+@contextmanager
+def timed_scope() -> Iterator[Dict[str, float]]:
+    """
+    Collect the stages timed inside this scope (a request or a job) and
+    observe each stage's total once on exit. Threads started with
+    ``asyncio.to_thread`` share the scope through the copied context.
+    """
+    stages: Dict[str, float] = defaultdict(float)
+    token = _stages.set(stages)
+    try:
+        yield stages
+    finally:
+        _stages.reset(token)
+        for name, seconds in stages.items():
+            STAGE_SECONDS.labels(name).observe(seconds)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a pipeline stage into the current scope (or directly when there is none)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        stages = _stages.get()
+        if stages is None:
+            STAGE_SECONDS.labels(name).observe(elapsed)
+        else:
+            stages[name] += elapsed
+
+
+def server_timing(stages: Dict[str, float]) -> str:
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in stages.items())
+
+
+def render() -> Tuple[bytes, str]:
+    """
+    Exposition of all metrics. With PROMETHEUS_MULTIPROC_DIR set (several
+    uvicorn workers), the values of every worker process are aggregated.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drop the live gauges of a worker that exited (multiprocess mode only)."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)  # type: ignore[no-untyped-call]
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: request latency, in-flight requests, and a
+    ``Server-Timing`` header with the stages timed before the response
+    started. Streamed responses only report the stages done before their
+    first byte.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        with timed_scope() as stages:
+
+            async def send_with_timing(message: Message) -> None:
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    if stages:
+                        headers = list(message.get("headers", []))
+                        headers.append((b"server-timing", server_timing(stages).encode("latin-1")))
+                        message["headers"] = headers
+                await send(message)
+
+            IN_FLIGHT.inc()
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                IN_FLIGHT.dec()
+                route = scope.get("route")
+                REQUEST_SECONDS.labels(
+                    scope["method"], getattr(route, "path", "unmatched"), str(status)
+                ).observe(time.perf_counter() - start)
@@ -0,0 +1,54 @@
+import mmap
+import re
+import zlib
+from typing import Optional, Union
+
+Buffer = Union[bytes, bytearray, mmap.mmap]
+
+# Linearized PDFs announce the page count up front: << /Linearized 1 ... /N 42 ... >>
+_LINEARIZED = re.compile(rb"/Linearized\s[^>]*?/N\s+(\d+)", re.S)
+
+# Page tree nodes: << /Type /Pages /Kids [...] /Count 42 >> (keys in any order)
+_PAGES_COUNT = re.compile(
+    rb"/Type\s*/Pages\b[^>]*?/Count\s+(\d+)|/Count\s+(\d+)[^>]*?/Type\s*/Pages\b",
+    re.S,
+)
+
+# Compressed object streams (PDF 1.5+) may hide the page tree
+_OBJSTM = re.compile(rb"/Type\s*/ObjStm\b[^>]*>>\s*stream\r?\n", re.S)
+
+
+def count_pdf_pages(buf: Buffer) -> Optional[int]:
+    """
+    Cheaply read the page count of a PDF without parsing it.
+
+    Looks at the linearization dictionary, then at page tree nodes (the root
+    has the largest ``/Count``), then inside Flate-compressed object streams.
+    Returns None when the buffer is not a PDF or the count cannot be found.
+    """
+    if bytes(buf[:5]) != b"%PDF-":
+        return None
+
+    m = _LINEARIZED.search(buf, 0, 4096)
+    if m:
+        return int(m.group(1))
+
+    count = _max_pages_count(buf)
+    if count:
+        return count
+
+    for m in _OBJSTM.finditer(buf):
+        end = buf.find(b"endstream", m.end())
+        if end < 0:
+            continue
+        try:
+            data = zlib.decompressobj().decompress(buf[m.end():end])
+        except zlib.error:
+            continue
+        count = max(count or 0, _max_pages_count(data) or 0)
+    return count or None
+
+
+def _max_pages_count(buf: Buffer) -> Optional[int]:
+    counts = [int(a or b) for a, b in _PAGES_COUNT.findall(buf)]
+    return max(counts) if counts else None
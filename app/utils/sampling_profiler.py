@@ -0,0 +1,88 @@
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Dict, Optional
+
+
+class SamplingProfiler:
+    """
+    Low-overhead wall-clock profiler that can be switched on in a running
+    process. A daemon thread samples the stacks of all other threads every
+    ``interval`` seconds; the result is in collapsed-stack format
+    (``frame;frame;frame count``), ready for flamegraph tools.
+
+    Only the calling process is sampled: with several uvicorn workers each
+    worker profiles itself. Chunking done in the process pool shows up as
+    the event loop waiting on it.
+    """
+
+    def __init__(self) -> None:
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._stacks: "Counter[str]" = Counter()
+        self.interval = 0.01
+        self.samples = 0
+        self.started_at: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: float = 0.01, duration: float = 300.0) -> None:
+        """
+        Start sampling from scratch; a running profile is discarded. Sampling
+        stops by itself after ``duration`` seconds, keeping the stacks.
+        """
+        self.stop()
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+        self.interval = interval
+        self.started_at = time.time()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(time.monotonic() + duration,), name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def collapsed(self) -> str:
+        with self._lock:
+            return "".join(f"{stack} {n}\n" for stack, n in self._stacks.most_common())
+
+    def status(self) -> Dict[str, object]:
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "samples": self.samples,
+            "started_at": self.started_at,
+        }
+
+    def _run(self, deadline: float) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            sample: "Counter[str]" = Counter()
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                names = []
+                f: Optional[FrameType] = frame
+                while f is not None:
+                    code = f.f_code
+                    names.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                    f = f.f_back
+                sample[";".join(reversed(names))] += 1
+            with self._lock:
+                self._stacks.update(sample)
+                self.samples += 1
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+
+class StartupTracker:
+    """
+    Start-up timing and readiness of one server process.
+
+    Importing the app is kept cheap; heavy dependencies are loaded by
+    ``warm_up`` instead. It runs once per process in the background of the
+    lifespan, or once in the master before forking when the app is preloaded
+    (see docker/gunicorn.conf.py). Forked workers then inherit the warm
+    modules copy-on-write and only time their own boot.
+    """
+
+    def __init__(self) -> None:
+        self.pid = os.getpid()
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.preloaded = False
+        self.warm = False
+        self.ready = False
+        self.boot_seconds: float | None = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def imported(self) -> None:
+        """Called once the app module has been imported."""
+        self.phases["import"] = time.perf_counter() - self.started
+
+    def warm_up(self) -> None:
+        """
+        Import the lazily loaded dependencies and build the default splitter.
+        Idempotent. Opens no files, sockets or threads, so it is safe to run
+        before forking.
+        """
+        with self._lock:
+            if self.warm:
+                return
+            from app.config.settings import settings
+            from app.services.chunking_service import chunk_service
+
+            with self.phase("warm_splitter"):
+                chunk_service.splitter
+            with self.phase("warm_azure_sdk"):
+                import azure.ai.documentintelligence.aio  # noqa: F401
+                import azure.ai.documentintelligence.models  # noqa: F401
+                import azure.core.exceptions  # noqa: F401
+            if settings.dedup_mode != "off" and settings.dedup_near_duplicates:
+                with self.phase("warm_numpy"):
+                    import numpy  # noqa: F401
+            self.warm = True
+
+    def mark_ready(self) -> None:
+        from app.utils.metrics import STARTUP_SECONDS
+
+        self.boot_seconds = time.perf_counter() - self.started
+        self.ready = True
+        for name, seconds in self.phases.items():
+            STARTUP_SECONDS.labels(name).set(seconds)
+        STARTUP_SECONDS.labels("boot").set(self.boot_seconds)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "status": "ready" if self.ready else "starting",
+            "pid": self.pid,
+            "preloaded": self.preloaded,
+            "warm": self.warm,
+            "boot_seconds": self.boot_seconds,
+            "phases": dict(self.phases),
+        }
+
+    def _after_fork(self) -> None:
+        # A forked worker inherits the parent's imports and warm-up, but
+        # boots (lifespan, readiness) on its own
+        self.pid = os.getpid()
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.preloaded = True
+        self.ready = False
+        self.boot_seconds = None
+        self._lock = threading.Lock()
+
+
+startup = StartupTracker()
+os.register_at_fork(after_in_child=startup._after_fork)
@@ -75,13 +75,81 @@ KEYWORD_PREFIX = re.compile(
     re.IGNORECASE | re.UNICODE
 )
 
+# ----------------- Single-pass engine -----------------
+
+# One alternation equivalent to trying every HEADING_PATTERNS entry in turn;
+# each branch keeps its own flags through a scoped inline group.
+HEADING_ANY = re.compile(
+    "|".join(
+        "(?i:%s)" % p.pattern if p.flags & re.IGNORECASE else "(?:%s)" % p.pattern
+        for p in HEADING_PATTERNS
+    ),
+    re.UNICODE,
+)
+
+# Prefilter run over the whole text at once: only lines that start with a
+# heading keyword or a Roman-numeral token can match any pattern above.
+# Anchoring on a literal "\n" (rather than ^ with MULTILINE) lets the regex
+# engine jump from newline to newline; the first line is checked separately.
+_CANDIDATE_BODY = (
+    r"[^\S\n]*(?:"
+    r"(?i:Phần|Chương|Mục|Tiểu|Điều|Khoản|Điểm|Tiết|Phụ|Mẫu|Biểu)"
+    r"|[IVXLCDM]{2}|[IVXLCDM]+[.)]"
+    r")"
+)
+HEADING_CANDIDATE = re.compile(_CANDIDATE_BODY, re.UNICODE)
+NEXT_HEADING_CANDIDATE = re.compile(r"\n" + _CANDIDATE_BODY, re.UNICODE)
+
+# Line boundaries recognised by str.splitlines() other than "\n"
+OTHER_LINE_BREAKS = re.compile("[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+
+def is_heading_line(stripped: str) -> bool:
+    """Classify one stripped line exactly like the per-line cascade."""
+    # --- Guards: skip obvious bullets/lists ---
+    # Skip "a) ...", "b.", "C)" etc. (lines that start with single letter + punct)
+    if SKIP_BARE_ALPHA.match(stripped) or SKIP_LOWER_ALPHA.match(stripped):
+        return False
+
+    # Skip "1) ...", "1.", "1-" unless the line starts with legal keywords
+    if SKIP_DANGEROUS_NUM.match(stripped) and not KEYWORD_PREFIX.match(stripped):
+        return False
+
+    # --- Match headings ---
+    return HEADING_ANY.match(stripped) is not None
+
+
 def find_headings(text: str) -> List[Tuple[int, int, str]]:
     """
     Detect heading lines and keep the full heading text.
 
+    Scans the whole text once for candidate lines and classifies only those,
+    instead of running the regex cascade on every line. Results are identical
+    to the per-line implementation.
+
     Returns:
         List of tuples (start_index, end_index, heading_text)
     """
+    # Exotic line breaks: keep str.splitlines() semantics exactly
+    if OTHER_LINE_BREAKS.search(text):
+        return _find_headings_by_line(text)
+
+    starts = [0] if HEADING_CANDIDATE.match(text) else []
+    starts.extend(m.start() + 1 for m in NEXT_HEADING_CANDIDATE.finditer(text))
+
+    results: List[Tuple[int, int, str]] = []
+    for start in starts:
+        nl = text.find("\n", start)
+        end = len(text) if nl < 0 else nl + 1
+        stripped = text[start:end].strip()
+        if is_heading_line(stripped):
+            # keep the full line sans leading/trailing spaces
+            results.append((start, end, stripped))
+    return results
+
+
+def _find_headings_by_line(text: str) -> List[Tuple[int, int, str]]:
+    """Reference per-line implementation, also used for texts with exotic line breaks."""
     results: List[Tuple[int, int, str]] = []
     pos = 0  # running absolute character offset
 
@@ -108,4 +176,4 @@ def find_headings(text: str) -> List[Tuple[int, int, str]]:
 
         pos += len(line)
 
-    return results
\ No newline at end of file
+    return results
@@ -0,0 +1,99 @@
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Protocol
+
+# Words, with combining diacritics kept attached, and single punctuation marks
+_WORDS = re.compile(r"[\w\u0300-\u036f]+|[^\w\s]", re.UNICODE)
+
+
+class Tokenizer(Protocol):
+    """Anything that can count the tokens of a string."""
+
+    def count(self, text: str) -> int: ...
+
+
+class WordPieceTokenizer:
+    """
+    Token counter for a WordPiece ``vocab.txt`` (one token per line, ``##``
+    marks word continuations), as used by BERT-style embedding models.
+
+    Splits on whitespace and punctuation, then greedily matches the longest
+    vocabulary piece. Per-word counts are memoized, so repeated words cost a
+    dictionary lookup.
+    """
+
+    def __init__(self, vocab_path: str, lowercase: bool = False, max_word_chars: int = 100) -> None:
+        with open(vocab_path, encoding="utf-8") as f:
+            self.vocab = frozenset(line.rstrip("\n") for line in f if line.strip())
+        self.lowercase = lowercase
+        self.max_word_chars = max_word_chars
+        self._word_counts: Dict[str, int] = {}
+
+    def count(self, text: str) -> int:
+        if self.lowercase:
+            text = text.lower()
+        total = 0
+        cache = self._word_counts
+        for word in _WORDS.findall(text):
+            n = cache.get(word)
+            if n is None:
+                n = self._count_word(word)
+                if len(cache) < 1_000_000:
+                    cache[word] = n
+            total += n
+        return total
+
+    def _count_word(self, word: str) -> int:
+        if len(word) > self.max_word_chars:
+            return 1  # [UNK]
+        vocab = self.vocab
+        pieces = 0
+        start = 0
+        while start < len(word):
+            end = len(word)
+            while end > start:
+                piece = word[start:end] if start == 0 else "##" + word[start:end]
+                if piece in vocab:
+                    break
+                end -= 1
+            if end == start:
+                return 1  # no piece matches: the whole word is [UNK]
+            pieces += 1
+            start = end
+        return pieces
+
+
+class HFTokenizer:
+    """Token counter for a Hugging Face ``tokenizer.json`` (needs the ``tokenizers`` extra)."""
+
+    def __init__(self, path: str) -> None:
+        try:
+            from tokenizers import Tokenizer as _Tokenizer
+        except ImportError as exc:
+            raise RuntimeError(
+                "tokenizer.json files need the optional 'tokenizers' package: "
+                "pip install 'ocr-chunking[tokenizers]'"
+            ) from exc
+        self._tokenizer = _Tokenizer.from_file(path)
+
+    def count(self, text: str) -> int:
+        return len(self._tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+@lru_cache(maxsize=None)
+def load_tokenizer(path: str, lowercase: bool = False) -> Tokenizer:
+    """Load a tokenizer from a local file, once per process. No network access."""
+    if path.endswith(".json"):
+        return HFTokenizer(path)
+    return WordPieceTokenizer(path, lowercase=lowercase)
+
+
+def cached_length_function(tokenizer: Tokenizer, maxsize: int = 8192) -> Callable[[str], int]:
+    """
+    Memoized ``tokenizer.count`` for the text splitter.
+
+    The recursive splitter measures the same pieces at every level and again
+    while merging and popping overlap, so most calls are repeats.
+    """
+    return lru_cache(maxsize=maxsize)(tokenizer.count)
+
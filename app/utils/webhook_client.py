@@ -1,9 +1,253 @@
+import asyncio
+import gzip
+import json
+import logging
+import random
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
 import httpx
-from typing import Dict, Any, Optional
-
-async def send_webhook(url: str, data: Dict[str, Any], auth: Optional[str] = None):
-    headers = {"Content-Type": "application/json"}
-    if auth:
-        headers["Authorization"] = auth
-    async with httpx.AsyncClient(timeout=10) as client:
-        await client.post(url, json=data, headers=headers)
\ No newline at end of file
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+@dataclass
+class _Delivery:
+    url: str
+    data: Dict[str, Any]
+    auth: Optional[str]
+    body: bytes = b""
+    headers: Dict[str, str] = field(default_factory=dict)
+    attempt: int = 0
+
+
+class WebhookDispatcher:
+    """
+    Queued webhook delivery over pooled per-host HTTP clients.
+
+    Payloads are queued as submitted and delivered by a fixed set of workers
+    from a bounded queue; each is serialized (and optionally gzipped) in a
+    thread before its first attempt, off the event loop. Transient failures
+    are put back on the queue after a jittered exponential backoff (or the
+    receiver's Retry-After), so a slow receiver does not hold a worker while
+    it waits. Pending deliveries are drained on shutdown so accepted
+    callbacks are not silently lost.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        queue_size: int,
+        max_attempts: int,
+        timeout: float,
+        max_connections_per_host: int,
+        gzip_enabled: bool,
+        gzip_min_bytes: int,
+    ) -> None:
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.max_connections_per_host = max_connections_per_host
+        self.gzip_enabled = gzip_enabled
+        self.gzip_min_bytes = gzip_min_bytes
+        self._queue: "asyncio.Queue[_Delivery]" = asyncio.Queue(maxsize=queue_size)
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._tasks: List["asyncio.Task[None]"] = []
+        # Deliveries waiting out a backoff before they are queued again
+        self._retries: Dict[int, asyncio.TimerHandle] = {}
+        # Accepted deliveries not yet delivered, failed or dropped
+        self._pending = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.in_flight = 0
+        self.counters: Dict[str, int] = {
+            "submitted": 0,
+            "delivered": 0,
+            "retried": 0,
+            "failed": 0,
+            "dropped": 0,
+            "bytes_sent": 0,
+        }
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._worker(), name=f"webhook-worker-{i}")
+                for i in range(self.workers)
+            ]
+
+    async def drain(self, timeout: float) -> None:
+        """Wait up to ``timeout`` seconds for pending deliveries and retries, then stop."""
+        if self._tasks:
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout)
+            except asyncio.TimeoutError:
+                self.counters["dropped"] += self._queue.qsize() + len(self._retries)
+            for handle in self._retries.values():
+                handle.cancel()
+            self._retries = {}
+            while not self._queue.empty():
+                self._queue.get_nowait()
+                self._queue.task_done()
+            self._pending = 0
+            self._idle.set()
+            for t in self._tasks:
+                t.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients = {}
+
+    def submit(self, url: str, data: Dict[str, Any], auth: Optional[str] = None) -> bool:
+        """Queue one JSON payload; returns False when the queue is full."""
+        self.start()
+        try:
+            self._queue.put_nowait(_Delivery(url=url, data=data, auth=auth))
+        except asyncio.QueueFull:
+            self.counters["dropped"] += 1
+            return False
+        self.counters["submitted"] += 1
+        self._pending += 1
+        self._idle.clear()
+        return True
+
+    def submit_sections(
+        self,
+        url: str,
+        sections: List[Dict[str, Any]],
+        auth: Optional[str] = None,
+        batch_size: int = 0,
+    ) -> None:
+        """Queue ``sections`` in pages of ``batch_size`` items (0 sends one payload)."""
+        if batch_size <= 0 or len(sections) <= batch_size:
+            self.submit(url, {"sections": sections}, auth)
+            return
+        batch_count = (len(sections) + batch_size - 1) // batch_size
+        for i in range(batch_count):
+            batch = sections[i * batch_size:(i + 1) * batch_size]
+            self.submit(
+                url,
+                {"sections": batch, "batch_index": i + 1, "batch_count": batch_count},
+                auth,
+            )
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            **self.counters,
+            "queue_depth": self._queue.qsize(),
+            "in_flight": self.in_flight,
+            "retry_waiting": len(self._retries),
+            "hosts": len(self._clients),
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            delivery = await self._queue.get()
+            self.in_flight += 1
+            try:
+                await self._deliver(delivery)
+            finally:
+                self.in_flight -= 1
+                self._queue.task_done()
+
+    async def _deliver(self, delivery: _Delivery) -> None:
+        """Make one attempt; a transient failure schedules the delivery again."""
+        retry_after: Optional[float] = None
+        try:
+            if delivery.attempt == 0:
+                delivery.body, delivery.headers = await asyncio.to_thread(
+                    self._encode, delivery.data, delivery.auth
+                )
+                delivery.data = {}
+            delivery.attempt += 1
+            r = await self._client_for(delivery.url).post(
+                delivery.url, content=delivery.body, headers=delivery.headers
+            )
+            if r.status_code < 400:
+                self.counters["delivered"] += 1
+                self.counters["bytes_sent"] += len(delivery.body)
+                self._finish()
+                return
+            retryable = r.status_code in _RETRYABLE_STATUS
+            retry_after = _retry_after_seconds(r.headers.get("Retry-After"))
+        except httpx.TransportError:
+            retryable = True
+        except Exception:
+            # A worker must outlive any single bad delivery
+            logger.exception("Webhook delivery to %s failed", delivery.url)
+            retryable = False
+
+        if not retryable or delivery.attempt >= self.max_attempts:
+            self.counters["failed"] += 1
+            self._finish()
+            return
+        self.counters["retried"] += 1
+        backoff = random.uniform(0, min(30.0, 0.5 * 2 ** (delivery.attempt - 1)))
+        delay = retry_after if retry_after is not None else backoff
+        self._retries[id(delivery)] = asyncio.get_running_loop().call_later(
+            delay, self._requeue, delivery
+        )
+
+    def _requeue(self, delivery: _Delivery) -> None:
+        del self._retries[id(delivery)]
+        try:
+            self._queue.put_nowait(delivery)
+        except asyncio.QueueFull:
+            self.counters["dropped"] += 1
+            self._finish()
+
+    def _finish(self) -> None:
+        self._pending -= 1
+        if self._pending <= 0:
+            self._idle.set()
+
+    def _encode(self, data: Dict[str, Any], auth: Optional[str]) -> Tuple[bytes, Dict[str, str]]:
+        body = json.dumps(data, ensure_ascii=False, default=str).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if auth:
+            headers["Authorization"] = auth
+        if self.gzip_enabled and len(body) >= self.gzip_min_bytes:
+            body = gzip.compress(body, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+        return body, headers
+
+    def _client_for(self, url: str) -> httpx.AsyncClient:
+        parts = urlsplit(url)
+        key = f"{parts.scheme}://{parts.netloc}"
+        client = self._clients.get(key)
+        if client is None:
+            client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections_per_host,
+                    max_keepalive_connections=self.max_connections_per_host,
+                ),
+            )
+            self._clients[key] = client
+        return client
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return min(60.0, max(0.0, float(value)))
+    except ValueError:
+        return None
+
+
+webhook_dispatcher = WebhookDispatcher(
+    workers=settings.webhook_workers,
+    queue_size=settings.webhook_queue_size,
+    max_attempts=settings.webhook_max_attempts,
+    timeout=settings.webhook_timeout,
+    max_connections_per_host=settings.webhook_max_connections_per_host,
+    gzip_enabled=settings.webhook_gzip,
+    gzip_min_bytes=settings.webhook_gzip_min_bytes,
+)
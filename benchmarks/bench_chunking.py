@@ -0,0 +1,136 @@
+"""
+Chunking throughput: character budget vs token budget.
+
+Splits a synthetic Vietnamese legal document with the character-length
+splitter and with the token-budget splitter (memoized and unmemoized
+length function), and reports throughput and chunk sizes. Without
+``--vocab`` a WordPiece vocabulary is derived from the corpus itself.
+
+It then checks that the chunking process pool returns exactly the chunks
+of inline splitting, with regex and with layout headings, and exits 1 if
+they differ.
+
+    python -m benchmarks.bench_chunking --pages 200 --repeat 3
+    python -m benchmarks.bench_chunking --vocab /models/bert/vocab.txt
+"""
+import argparse
+import asyncio
+import os
+import re
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Callable, List, Tuple
+
+os.environ.setdefault("AZURE_DI_ENDPOINT", "http://localhost")
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from benchmarks.corpus import generate_document, generate_legal_document
+from app.config.settings import settings
+from app.services.chunk_pool import chunk_pool
+from app.services.chunk_spans import chunk_offsets
+from app.services.chunking_service import chunk_service
+from app.utils.layout import LAYOUT_HEADINGS_KEY
+from app.utils.text_headings import find_headings
+from app.utils.tokenizers import WordPieceTokenizer, cached_length_function
+
+
+def build_vocab(text: str, path: str, words: int = 2000) -> None:
+    """Write a WordPiece vocab: frequent words plus every character as a piece."""
+    counts = Counter(re.findall(r"\w+", text))
+    chars = sorted(set(text) - set(" \n\t"))
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+    vocab += chars + ["##" + c for c in chars]
+    vocab += [w for w, _ in counts.most_common(words)]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(dict.fromkeys(vocab)) + "\n")
+
+
+def run(
+    splitter: RecursiveCharacterTextSplitter, text: str, repeat: int
+) -> Tuple[float, List[Tuple[int, int]]]:
+    best = float("inf")
+    offsets: List[Tuple[int, int]] = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        offsets = chunk_offsets(splitter, text)
+        best = min(best, time.perf_counter() - t0)
+    return len(text.encode("utf-8")) / best / 1e6, offsets
+
+
+def make_splitter(size: int, overlap: int, length: Callable[[str], int]) -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter(
+        chunk_size=size, chunk_overlap=overlap, length_function=length, add_start_index=True
+    )
+
+
+def check_pool(pages: int) -> bool:
+    """Compare process-pool chunks with inline chunks, text and metadata."""
+    text = generate_legal_document(pages)
+    docs = {
+        "regex": Document(page_content=text, metadata={"source": "doc.pdf"}),
+        "layout": Document(
+            page_content=text, metadata={"source": "doc.pdf", LAYOUT_HEADINGS_KEY: find_headings(text)}
+        ),
+    }
+    threshold = settings.chunk_pool_min_chars
+    ok = True
+    try:
+        for name, doc in docs.items():
+            inline = [(c.text, c.metadata()) for c in chunk_service.split_spans([doc])]
+            settings.chunk_pool_min_chars = 1
+            pooled = [(c.text, c.metadata()) for c in asyncio.run(chunk_service.asplit_spans([doc]))]
+            settings.chunk_pool_min_chars = threshold
+            same = pooled == inline
+            ok = ok and same
+            print(f"{'pool ' + name:>12}: {len(pooled)}/{len(inline)} chunks {'match' if same else 'DIFFER'}")
+    finally:
+        settings.chunk_pool_min_chars = threshold
+        chunk_pool.shutdown()
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--vocab", help="WordPiece vocab.txt (default: derived from the corpus)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="characters")
+    parser.add_argument("--token-size", type=int, default=256, help="tokens")
+    args = parser.parse_args()
+
+    text = generate_document(args.pages)
+    vocab = args.vocab
+    if vocab is None:
+        fd, vocab = tempfile.mkstemp(suffix=".txt")
+        os.close(fd)
+        build_vocab(text, vocab)
+    tokenizer = WordPieceTokenizer(vocab)
+
+    modes = [
+        ("chars", make_splitter(args.chunk_size, args.chunk_size // 5, len)),
+        ("tokens", make_splitter(args.token_size, args.token_size // 5, tokenizer.count)),
+        ("tokens+memo", make_splitter(
+            args.token_size, args.token_size // 5, cached_length_function(tokenizer)
+        )),
+    ]
+    print(f"{len(text) / 1e6:.1f}M chars, {tokenizer.count(text)} tokens, {len(tokenizer.vocab)} vocab entries")
+    for name, splitter in modes:
+        mbps, offsets = run(splitter, text, args.repeat)
+        tokens = [tokenizer.count(text[s:s + n]) for s, n in offsets]
+        print(
+            f"{name:>12}: {mbps:8.2f} MB/s  {len(offsets):6d} chunks  "
+            f"tokens/chunk avg {sum(tokens) / len(tokens):6.1f} max {max(tokens)}"
+        )
+
+    if args.vocab is None:
+        os.unlink(vocab)
+
+    return 0 if check_pool(args.pages) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
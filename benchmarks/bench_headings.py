@@ -0,0 +1,84 @@
+"""
+Heading detection benchmark and differential check.
+
+Generates large synthetic Vietnamese legal documents, verifies that the
+single-pass ``find_headings`` returns exactly what the per-line reference
+implementation returns (plus a randomized fuzz corpus of tricky lines), and
+reports throughput for both.
+
+    python -m benchmarks.bench_headings --pages 1000 --repeat 5
+"""
+import argparse
+import random
+import time
+from typing import Callable, List, Tuple
+
+from app.utils.text_headings import _find_headings_by_line, find_headings
+from benchmarks.corpus import generate_document
+
+FUZZ_TOKENS = [
+    "Phần", "PHẦN", "phần", "Chương", "chương", "Mục", "Tiểu mục", "Tiểumục", "Điều", "ĐIỀU",
+    "Khoản", "Điểm", "Tiết", "Phụ lục", "PHỤ LỤC", "Mẫu", "Biểu", "số", "I", "II", "IV", "ivx",
+    "MCM", "C", "D", "a", "A", "b", "1", "12", "07", ".", ".-", ")", ":", "-", "–", "—",
+    "abc", "Căn", "cứ", "Luật", "x", "ı", "K",
+]
+FUZZ_SPACES = ["", " ", "  ", "\t", " ", "　", "\x1f"]
+
+
+def fuzz_document(lines: int, seed: int = 0, exotic_breaks: bool = False) -> str:
+    """Random short lines built from heading fragments, odd spacing and punctuation."""
+    rng = random.Random(seed)
+    breaks = ["\n"] + (["\r\n", "\r", "\x0b", "\x0c", "\x1c", "\x85", " "] if exotic_breaks else [])
+    out: List[str] = []
+    for _ in range(lines):
+        parts = [rng.choice(FUZZ_TOKENS) for _ in range(rng.randint(0, 5))]
+        line = rng.choice(FUZZ_SPACES).join(parts)
+        out.append(rng.choice(FUZZ_SPACES) + line + rng.choice(FUZZ_SPACES) + rng.choice(breaks))
+    return "".join(out)
+
+
+def check_identical() -> int:
+    """Differential check of the single-pass engine against the per-line reference."""
+    corpora = [generate_document(50, seed=s) for s in range(3)]
+    corpora += [fuzz_document(20000, seed=s) for s in range(5)]
+    corpora += [fuzz_document(5000, seed=s, exotic_breaks=True) for s in range(3)]
+    corpora += ["", "\n", "Điều 1", "Điều 1. a\n\n", "  II  Chương mới  "]
+    checked = 0
+    for text in corpora:
+        expected = _find_headings_by_line(text)
+        actual = find_headings(text)
+        if actual != expected:
+            for i, (a, e) in enumerate(zip(actual, expected)):
+                if a != e:
+                    raise AssertionError(f"Mismatch at heading {i}: {a!r} != {e!r}")
+            raise AssertionError(f"Heading count differs: {len(actual)} != {len(expected)}")
+        checked += len(expected)
+    return checked
+
+
+def throughput(fn: Callable[[str], List[Tuple[int, int, str]]], text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - t0)
+    return len(text.encode("utf-8")) / best / 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"differential check: {check_identical()} headings identical")
+
+    text = generate_document(args.pages)
+    lines = text.count("\n")
+    for name, fn in (("per-line", _find_headings_by_line), ("single-pass", find_headings)):
+        mbps = throughput(fn, text, args.repeat)
+        print(f"{name:>12}: {mbps:8.2f} MB/s  ({args.pages} pages, {lines} lines)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Synthetic Vietnamese legal documents for the benchmarks.
+
+``generate_document`` mixes random heading and body lines (the heading
+benchmark corpus). ``generate_legal_pages`` builds a structured document as
+Azure DI returns it in markdown mode: a Phần > Chương > Điều > Khoản
+hierarchy with point and bullet lists, and page header, footer and
+page-number markers on every page. Both are deterministic for a seed.
+"""
+import random
+from typing import Iterator, List
+
+HEADING_LINES = [
+    "Phần {r}. QUY ĐỊNH CHUNG",
+    "PHẦN {n}",
+    "Chương {r}",
+    "CHƯƠNG {r}. NHỮNG QUY ĐỊNH CHUNG",
+    "Mục {n}. Thủ tục hành chính",
+    "Tiểu mục {r}",
+    "Điều {n}. Phạm vi điều chỉnh",
+    "Điều {n}.- Đối tượng áp dụng",
+    "ĐIỀU {n}: Giải thích từ ngữ",
+    "Khoản {n}) Người nộp thuế",
+    "Điểm a) Trường hợp đặc biệt",
+    "Tiết 1. Quy định chuyển tiếp",
+    "Phụ lục số {n} DANH MỤC HÀNG HÓA",
+    "PHỤ LỤC {r}",
+    "Mẫu số {n:02d} - Tờ khai",
+    "Biểu số {n}: Báo cáo tổng hợp",
+    "{r}. TÌNH HÌNH THỰC HIỆN",
+]
+
+BODY_LINES = [
+    "Căn cứ Luật Tổ chức Chính phủ ngày 18 tháng 02 năm 2025;",
+    "Theo đề nghị của Bộ trưởng Bộ Tài chính;",
+    "Nghị định này quy định chi tiết về người nộp thuế tại khoản 1, 4 và khoản 5 Điều 4.",
+    "các tổ chức, cá nhân khác có liên quan thực hiện theo quy định của pháp luật.",
+    "Người nộp thuế thực hiện theo quy định tại Điều 4 Luật Thuế giá trị gia tăng.",
+    "1. Người nộp thuế quy định tại Điều 3 Nghị định này.",
+    "2) Cơ quan quản lý thuế theo quy định của pháp luật về quản lý thuế.",
+    "a) Các tổ chức được thành lập và đăng ký kinh doanh theo Luật Doanh nghiệp;",
+    "b. Các doanh nghiệp có vốn đầu tư nước ngoài;",
+    "- Hồ sơ gồm: tờ khai, bản sao giấy tờ có liên quan.",
+    "Mức thuế suất 10% áp dụng đối với hàng hóa, dịch vụ không thuộc đối tượng khác.",
+    "",
+    "<!-- PageBreak -->",
+    '<!-- PageHeader="CÔNG BÁO/Số 123" -->',
+]
+
+
+def roman(n: int) -> str:
+    vals = [(1000, "M"), (900, "CM"), (500, "D"), (400, "CD"), (100, "C"), (90, "XC"),
+            (50, "L"), (40, "XL"), (10, "X"), (9, "IX"), (5, "V"), (4, "IV"), (1, "I")]
+    out = ""
+    for v, s in vals:
+        while n >= v:
+            out += s
+            n -= v
+    return out
+
+
+def generate_document(pages: int, lines_per_page: int = 60, seed: int = 0) -> str:
+    """Synthetic legal text: mostly body lines with a heading every few lines."""
+    rng = random.Random(seed)
+    out: List[str] = []
+    for _ in range(pages):
+        for _ in range(lines_per_page):
+            if rng.random() < 0.12:
+                n = rng.randint(1, 40)
+                out.append(rng.choice(HEADING_LINES).format(n=n, r=roman(n)))
+            else:
+                out.append(rng.choice(BODY_LINES))
+        out.append("<!-- PageBreak -->")
+    return "\n".join(out) + "\n"
+
+
+KHOAN_LINES = [
+    "Người nộp thuế có trách nhiệm kê khai, nộp thuế đầy đủ, đúng thời hạn theo quy định.",
+    "Cơ quan quản lý thuế hướng dẫn, kiểm tra việc thực hiện các quy định tại Điều này.",
+    "Trường hợp hồ sơ chưa đầy đủ, trong thời hạn 03 ngày làm việc cơ quan tiếp nhận thông báo cho người nộp hồ sơ.",
+    "Hàng hóa, dịch vụ thuộc đối tượng không chịu thuế giá trị gia tăng bao gồm:",
+    "Thời điểm xác định thuế được thực hiện như sau:",
+]
+
+POINT_LINES = [
+    "Sản phẩm trồng trọt, chăn nuôi, thủy sản nuôi trồng chưa chế biến thành các sản phẩm khác;",
+    "Dịch vụ cấp tín dụng, kinh doanh chứng khoán, chuyển nhượng vốn;",
+    "Đối với bán hàng hóa là thời điểm chuyển giao quyền sở hữu hoặc quyền sử dụng hàng hóa cho người mua;",
+    "Đối với cung cấp dịch vụ là thời điểm hoàn thành việc cung cấp dịch vụ, không phân biệt đã thu được tiền hay chưa thu được tiền;",
+    "Các trường hợp khác theo quy định của Chính phủ.",
+]
+
+BULLET_LINES = [
+    "- Tờ khai theo Mẫu số 01/GTGT ban hành kèm theo Nghị định này;",
+    "- Bản sao hợp đồng, hóa đơn, chứng từ có liên quan;",
+    "• Văn bản đề nghị của người nộp thuế;",
+    "+ Các giấy tờ khác theo yêu cầu của cơ quan quản lý thuế.",
+]
+
+DIEU_TITLES = [
+    "Phạm vi điều chỉnh", "Đối tượng áp dụng", "Giải thích từ ngữ", "Người nộp thuế",
+    "Đối tượng không chịu thuế", "Giá tính thuế", "Thời điểm xác định thuế", "Thuế suất",
+    "Phương pháp tính thuế", "Hồ sơ, thủ tục hoàn thuế", "Hiệu lực thi hành", "Trách nhiệm thi hành",
+]
+
+
+def _legal_lines(rng: random.Random) -> Iterator[str]:
+    """Endless body of a legal document, in reading order."""
+    letters = "abcdđeghiklmn"
+    phan = chuong = dieu = 0
+    while True:
+        phan += 1
+        yield f"Phần {roman(phan)}"
+        yield rng.choice(["QUY ĐỊNH CHUNG", "NHỮNG QUY ĐỊNH CỤ THỂ", "ĐIỀU KHOẢN THI HÀNH"])
+        for _ in range(rng.randint(2, 6)):
+            chuong += 1
+            yield ""
+            yield f"Chương {roman(chuong)}"
+            yield rng.choice(["NHỮNG QUY ĐỊNH CHUNG", "KÊ KHAI, NỘP THUẾ", "HOÀN THUẾ", "TỔ CHỨC THỰC HIỆN"])
+            for _ in range(rng.randint(3, 8)):
+                dieu += 1
+                yield ""
+                yield f"Điều {dieu}. {rng.choice(DIEU_TITLES)}"
+                for k in range(1, rng.randint(1, 5) + 1):
+                    yield f"{k}. {rng.choice(KHOAN_LINES)}"
+                    for p in range(rng.choice([0, 0, 2, 3, 4])):
+                        yield f"{letters[p]}) {rng.choice(POINT_LINES)}"
+                    if rng.random() < 0.2:
+                        for _ in range(rng.randint(2, 4)):
+                            yield rng.choice(BULLET_LINES)
+
+
+def generate_legal_pages(pages: int, lines_per_page: int = 45, seed: int = 0) -> List[str]:
+    """Page texts of one structured document, each with DI page markers."""
+    rng = random.Random(seed)
+    lines = _legal_lines(rng)
+    out: List[str] = []
+    for page in range(1, pages + 1):
+        body = [next(lines) for _ in range(lines_per_page)]
+        out.append("\n".join([
+            f'<!-- PageHeader="CÔNG BÁO/Số {100 + seed}/Ngày 01-7-2025" -->',
+            *body,
+            '<!-- PageFooter="Nghị định số 181/2025/NĐ-CP" -->',
+            f'<!-- PageNumber="{page}" -->',
+        ]))
+    return out
+
+
+def generate_legal_document(pages: int, lines_per_page: int = 45, seed: int = 0) -> str:
+    """``generate_legal_pages`` joined as one markdown-mode document."""
+    return "\n<!-- PageBreak -->\n".join(generate_legal_pages(pages, lines_per_page, seed))
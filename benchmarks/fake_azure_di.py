@@ -0,0 +1,305 @@
+"""
+Local stand-in for Azure AI Document Intelligence, for load tests.
+
+Speaks the REST protocol the SDK uses for analyze calls:
+
+    POST /documentintelligence/documentModels/{model}:analyze      -> 202 + Operation-Location
+    GET  /documentintelligence/documentModels/{model}/analyzeResults/{id}
+                                                                -> running | succeeded | failed
+
+Each operation takes ``--latency`` seconds plus ``--per-page`` seconds per
+page (with ``--jitter``). The results are synthetic legal documents from
+``benchmarks.corpus``, in markdown or text format, with pages, lines and
+paragraphs whose roles (title, sectionHeading, pageHeader, ...) and
+unicodeCodePoint spans match what layout sectioning reads. The page count
+comes from the uploaded PDF and honours the ``pages`` range parameter. The
+text is seeded from the upload, so the same document always gives the same
+result.
+
+Faults can be injected:
+
+- ``--throttle`` answers a share of submits with 429 and Retry-After.
+- ``--max-running`` throttles once that many operations are in progress.
+- ``--fail`` answers a share of submits with 500.
+- ``--op-fail`` ends a share of operations with ``status: failed``.
+
+``GET /files/{name}?pages=N`` serves tiny PDFs with N pages for the service
+to download. Its content depends on the full URL, so adding a query
+parameter gives a new document, with a new checksum and an OCR cache miss.
+
+    python -m benchmarks.fake_azure_di --port 5055 --latency 2 --per-page 0.05 --throttle 0.02
+    AZURE_DI_ENDPOINT=http://127.0.0.1:5055 AZURE_DI_API_KEY=fake uvicorn app.main:app
+"""
+import argparse
+import random
+import re
+import time
+import uuid
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+
+from app.utils.pdf_pages import count_pdf_pages
+from benchmarks.corpus import generate_legal_pages
+
+API_PREFIX = "/documentintelligence/documentModels"
+
+# Results are kept this long after an operation finished, like DI keeps them for 24h
+RESULT_TTL_SECONDS = 300.0
+
+_COMMENT = re.compile(r'<!--\s*(PageHeader|PageFooter|PageNumber)="([^"]*)"\s*-->')
+_FURNITURE_ROLES = {"PageHeader": "pageHeader", "PageFooter": "pageFooter", "PageNumber": "pageNumber"}
+_HEADING = re.compile(r"^(?:Phần|Chương)\s+[IVXLCDM]+$|^Điều\s+\d+\.")
+
+
+@dataclass
+class FakeConfig:
+    latency: float = 1.0
+    per_page: float = 0.02
+    jitter: float = 0.2
+    poll_interval: float = 0.1
+    throttle: float = 0.0
+    max_running: int = 0  # 0 = unlimited
+    retry_after: int = 1
+    fail: float = 0.0
+    op_fail: float = 0.0
+    default_pages: int = 5
+    lines_per_page: int = 45
+
+
+@dataclass
+class Operation:
+    ready_at: float
+    pages: int
+    body: Dict[str, Any]
+    failed: bool = False
+    created: float = field(default_factory=time.time)
+
+
+config = FakeConfig()
+operations: Dict[str, Operation] = {}
+app = FastAPI(title="Fake Azure Document Intelligence")
+
+
+def _error(status: int, code: str, message: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    return JSONResponse({"error": {"code": code, "message": message}}, status_code=status, headers=headers)
+
+
+def _running() -> int:
+    now = time.monotonic()
+    return sum(1 for op in operations.values() if op.ready_at > now)
+
+
+def _expire() -> None:
+    cutoff = time.monotonic() - RESULT_TTL_SECONDS
+    for op_id in [k for k, op in operations.items() if op.ready_at < cutoff]:
+        del operations[op_id]
+
+
+def parse_pages(spec: Optional[str], total: int) -> List[int]:
+    """Page numbers selected by a DI ``pages`` parameter such as ``1-3,5``."""
+    if not spec:
+        return list(range(1, total + 1))
+    out: List[int] = []
+    for part in spec.split(","):
+        first, _, last = part.strip().partition("-")
+        out.extend(range(int(first), min(int(last or first), total) + 1))
+    return sorted(set(p for p in out if 1 <= p <= total))
+
+
+def _plain(line: str) -> Tuple[str, Optional[str]]:
+    """A content line as OCR'd text, and its paragraph role if any."""
+    m = _COMMENT.fullmatch(line)
+    if m:
+        return m.group(2), _FURNITURE_ROLES[m.group(1)]
+    if _HEADING.match(line):
+        return line, "sectionHeading"
+    return line, None
+
+
+def analyze_result(
+    model_id: str,
+    page_texts: List[Tuple[int, str]],
+    markdown: bool,
+) -> Dict[str, Any]:
+    """An AnalyzeResult body for (page number, markdown page text) pairs."""
+    content: List[str] = []
+    pos = 0
+    pages: List[Dict[str, Any]] = []
+    paragraphs: List[Dict[str, Any]] = []
+    sep = "\n<!-- PageBreak -->\n" if markdown else "\n"
+    for i, (number, text) in enumerate(page_texts):
+        if i:
+            content.append(sep)
+            pos += len(sep)
+        page_start = pos
+        lines: List[Dict[str, Any]] = []
+        for j, raw in enumerate(text.split("\n")):
+            if j:
+                content.append("\n")
+                pos += 1
+            plain, role = _plain(raw)
+            out = raw if markdown else plain
+            span = {"offset": pos, "length": len(out)}
+            content.append(out)
+            pos += len(out)
+            if not plain:
+                continue
+            lines.append({"content": plain, "polygon": [], "spans": [span]})
+            if role == "sectionHeading" and number == 1 and not paragraphs:
+                role = "title"
+            paragraph: Dict[str, Any] = {"content": plain, "spans": [span]}
+            if role:
+                paragraph["role"] = role
+            paragraphs.append(paragraph)
+        pages.append({
+            "pageNumber": number,
+            "width": 8.2639,
+            "height": 11.6944,
+            "unit": "inch",
+            "spans": [{"offset": page_start, "length": pos - page_start}],
+            "lines": lines,
+        })
+    return {
+        "apiVersion": "2024-11-30",
+        "modelId": model_id,
+        "stringIndexType": "unicodeCodePoint",
+        "content": "".join(content),
+        "contentFormat": "markdown" if markdown else "text",
+        "pages": pages,
+        "paragraphs": paragraphs,
+    }
+
+
+@app.post(API_PREFIX + "/{model_id}:analyze")
+async def analyze(model_id: str, request: Request) -> Response:
+    _expire()
+    if config.fail and random.random() < config.fail:
+        return _error(500, "InternalServerError", "Injected failure.")
+    if (config.throttle and random.random() < config.throttle) or (
+        config.max_running and _running() >= config.max_running
+    ):
+        return _error(
+            429, "TooManyRequests", "Injected throttling.", headers={"Retry-After": str(config.retry_after)}
+        )
+
+    body = await request.body()
+    if request.headers.get("content-type", "").startswith("application/json"):
+        # {"urlSource": ...} or {"base64Source": ...}: seed on the reference only
+        total = config.default_pages
+    else:
+        total = count_pdf_pages(body) or config.default_pages
+    seed = zlib.crc32(body) % 10000
+    numbers = parse_pages(request.query_params.get("pages"), total)
+    if not numbers:
+        return _error(400, "InvalidRequest", "No pages selected.")
+
+    texts = generate_legal_pages(numbers[-1], config.lines_per_page, seed)
+    markdown = request.query_params.get("outputContentFormat") == "markdown"
+    result = analyze_result(model_id, [(n, texts[n - 1]) for n in numbers], markdown)
+
+    duration = config.latency + config.per_page * len(numbers)
+    duration *= 1 + random.uniform(-config.jitter, config.jitter)
+    op_id = uuid.uuid4().hex
+    operations[op_id] = Operation(
+        ready_at=time.monotonic() + max(0.0, duration),
+        pages=len(numbers),
+        body=result,
+        failed=bool(config.op_fail and random.random() < config.op_fail),
+    )
+    location = str(request.url_for("analyze_result_status", model_id=model_id, result_id=op_id))
+    location += "?api-version=" + request.query_params.get("api-version", "2024-11-30")
+    return Response(status_code=202, headers={"Operation-Location": location})
+
+
+@app.get(API_PREFIX + "/{model_id}/analyzeResults/{result_id}", name="analyze_result_status")
+async def analyze_result_status(model_id: str, result_id: str) -> Response:
+    op = operations.get(result_id)
+    if op is None:
+        return _error(404, "NotFound", "Resource not found.")
+    created = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(op.created))
+    now = time.monotonic()
+    if op.ready_at > now:
+        # The SDK waits retry-after-ms between polls (Retry-After only has whole seconds)
+        wait_ms = max(1, int(min(config.poll_interval, op.ready_at - now) * 1000))
+        return JSONResponse(
+            {"status": "running", "createdDateTime": created, "lastUpdatedDateTime": created},
+            headers={"retry-after-ms": str(wait_ms)},
+        )
+    if op.failed:
+        return JSONResponse({
+            "status": "failed",
+            "createdDateTime": created,
+            "lastUpdatedDateTime": created,
+            "error": {"code": "InternalServerError", "message": "Injected operation failure."},
+        })
+    return JSONResponse({
+        "status": "succeeded",
+        "createdDateTime": created,
+        "lastUpdatedDateTime": created,
+        "analyzeResult": op.body,
+    })
+
+
+@app.get("/files/{name}")
+async def file(name: str, request: Request, pages: Optional[int] = None, size: int = 0) -> Response:
+    """A minimal PDF with ``pages`` pages, padded to ``size`` bytes."""
+    count = pages or config.default_pages
+    body = (
+        f"%PDF-1.4\n% {request.url}\n"
+        f"1 0 obj\n<< /Type /Pages /Kids [] /Count {count} >>\nendobj\n"
+    ).encode("utf-8")
+    padding = size - len(body) - len(b"%\n%%EOF\n")
+    if padding > 0:
+        body += b"%" + b"0" * padding + b"\n"
+    body += b"%%EOF\n"
+    return Response(body, media_type="application/pdf")
+
+
+@app.get("/stats")
+async def stats() -> Dict[str, Any]:
+    return {"operations": len(operations), "running": _running(), "config": config.__dict__}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--latency", type=float, default=config.latency, help="seconds per operation")
+    parser.add_argument("--per-page", type=float, default=config.per_page, help="extra seconds per page")
+    parser.add_argument("--jitter", type=float, default=config.jitter, help="relative +/- latency spread")
+    parser.add_argument("--poll-interval", type=float, default=config.poll_interval, help="seconds between polls")
+    parser.add_argument("--throttle", type=float, default=config.throttle, help="share of submits answered 429")
+    parser.add_argument("--max-running", type=int, default=config.max_running,
+                        help="429 once this many operations run (0 = no limit)")
+    parser.add_argument("--retry-after", type=int, default=config.retry_after, help="Retry-After seconds on 429")
+    parser.add_argument("--fail", type=float, default=config.fail, help="share of submits answered 500")
+    parser.add_argument("--op-fail", type=float, default=config.op_fail, help="share of operations that fail")
+    parser.add_argument("--pages", type=int, default=config.default_pages,
+                        help="pages of uploads whose page count is unknown")
+    parser.add_argument("--lines-per-page", type=int, default=config.lines_per_page)
+    parser.add_argument("--seed", type=int, help="seed the fault injection")
+    args = parser.parse_args(argv)
+
+    config.latency = args.latency
+    config.per_page = args.per_page
+    config.jitter = args.jitter
+    config.poll_interval = args.poll_interval
+    config.throttle = args.throttle
+    config.max_running = args.max_running
+    config.retry_after = args.retry_after
+    config.fail = args.fail
+    config.op_fail = args.op_fail
+    config.default_pages = args.pages
+    config.lines_per_page = args.lines_per_page
+    if args.seed is not None:
+        random.seed(args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
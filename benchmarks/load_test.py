@@ -0,0 +1,299 @@
+"""
+Load driver: replay a request log against the service at a target rate and
+report latency percentiles and throughput.
+
+The log is JSONL with one request per line, either a bare
+``OCRChunkingRequest`` body (posted to ``/api/v1/ocr-chunking``) or
+``{"method": ..., "path": ..., "body": ..., "headers": ...}``. Lines are sent
+in order at ``--rps``, either evenly spaced or with ``--poisson`` arrivals.
+They are looped until ``--duration`` or ``--requests`` is reached.
+
+Arrivals are open-loop. Latency is measured from each request's scheduled
+start, so time spent waiting for a ``--max-in-flight`` slot counts, and a
+saturated service shows up as growing latency instead of a lower send
+rate.
+
+Against the local Azure DI stand-in (``benchmarks.fake_azure_di``):
+
+    python -m benchmarks.load_test make-log --files http://127.0.0.1:5055 --count 200 --pages 1,10,50 > load.jsonl
+    python -m benchmarks.load_test run load.jsonl --target http://127.0.0.1:8000 --rps 5 --duration 60
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import urlencode
+
+import httpx
+
+DEFAULT_PATH = "/api/v1/ocr-chunking"
+
+
+@dataclass
+class LoggedRequest:
+    method: str
+    path: str
+    body: Any = None
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class Outcome:
+    status: Optional[int]  # None when the request did not complete
+    latency: float
+    wait: float
+    size: int = 0
+    error: Optional[str] = None
+    stages: Dict[str, float] = field(default_factory=dict)
+
+
+def load_log(path: Path) -> List[LoggedRequest]:
+    entries: List[LoggedRequest] = []
+    with path.open(encoding="utf-8") as f:
+        for n, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if "path" in item:
+                entries.append(LoggedRequest(
+                    method=item.get("method", "POST").upper(),
+                    path=item["path"],
+                    body=item.get("body"),
+                    headers=item.get("headers") or {},
+                ))
+            elif "url" in item and "document_id" in item:
+                entries.append(LoggedRequest(method="POST", path=DEFAULT_PATH, body=item))
+            else:
+                raise ValueError(f"{path}:{n}: neither a request entry nor an ocr-chunking body")
+    if not entries:
+        raise ValueError(f"{path}: no requests")
+    return entries
+
+
+def parse_server_timing(value: str) -> Dict[str, float]:
+    """``name;dur=12.3, ...`` -> {name: seconds}."""
+    stages: Dict[str, float] = {}
+    for part in value.split(","):
+        name, _, params = part.strip().partition(";")
+        for param in params.split(";"):
+            key, _, dur = param.strip().partition("=")
+            if key == "dur" and name:
+                try:
+                    stages[name] = float(dur) / 1000
+                except ValueError:
+                    pass
+    return stages
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return float("nan")
+    rank = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def _schedule(rps: float, poisson: bool, rng: random.Random) -> Iterator[float]:
+    """Start offsets in seconds from the beginning of the run."""
+    t = 0.0
+    while True:
+        yield t
+        t += rng.expovariate(rps) if poisson else 1 / rps
+
+
+def _unique(entry: LoggedRequest, n: int) -> LoggedRequest:
+    """Give the document a fresh URL (and id) so every send misses the OCR cache."""
+    body = entry.body
+    if not isinstance(body, dict) or "url" not in body:
+        return entry
+    sep = "&" if "?" in body["url"] else "?"
+    body = {**body, "url": f"{body['url']}{sep}{urlencode({'v': n})}"}
+    if "document_id" in body:
+        body["document_id"] = f"{body['document_id']}-{n}"
+    return LoggedRequest(entry.method, entry.path, body, entry.headers)
+
+
+async def _send(
+    client: httpx.AsyncClient,
+    entry: LoggedRequest,
+    scheduled: float,
+    slots: asyncio.Semaphore,
+) -> Outcome:
+    async with slots:
+        started = time.perf_counter()
+        try:
+            response = await client.request(
+                entry.method,
+                entry.path,
+                json=entry.body,
+                headers=entry.headers,
+            )
+            size = len(response.content)
+        except httpx.HTTPError as exc:
+            return Outcome(
+                status=None,
+                latency=time.perf_counter() - scheduled,
+                wait=started - scheduled,
+                error=type(exc).__name__,
+            )
+    return Outcome(
+        status=response.status_code,
+        latency=time.perf_counter() - scheduled,
+        wait=started - scheduled,
+        size=size,
+        stages=parse_server_timing(response.headers.get("server-timing", "")),
+    )
+
+
+async def run(
+    entries: List[LoggedRequest],
+    target: str,
+    rps: float,
+    duration: Optional[float],
+    requests: Optional[int],
+    max_in_flight: int,
+    timeout: float,
+    poisson: bool = False,
+    unique: bool = False,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    if duration is None and requests is None:
+        requests = len(entries)
+    rng = random.Random(seed)
+    slots = asyncio.Semaphore(max_in_flight)
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+    tasks: List["asyncio.Task[Outcome]"] = []
+
+    async with httpx.AsyncClient(base_url=target, timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+        for n, offset in enumerate(_schedule(rps, poisson, rng)):
+            if (requests is not None and n >= requests) or (duration is not None and offset >= duration):
+                break
+            delay = start + offset - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            entry = entries[n % len(entries)]
+            if unique:
+                entry = _unique(entry, n)
+            tasks.append(asyncio.create_task(_send(client, entry, start + offset, slots)))
+        sent_for = time.perf_counter() - start
+        outcomes: List[Outcome] = await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+    return summarize(outcomes, rps, sent_for, elapsed)
+
+
+def summarize(outcomes: List[Outcome], rps: float, sent_for: float, elapsed: float) -> Dict[str, Any]:
+    ok = [o for o in outcomes if o.status is not None and 200 <= o.status < 300]
+    latencies = sorted(o.latency for o in ok)
+    waits = sorted(o.wait for o in outcomes)
+    stage_totals: Dict[str, float] = defaultdict(float)
+    for o in ok:
+        for name, seconds in o.stages.items():
+            stage_totals[name] += seconds
+    statuses = Counter(str(o.status) if o.status is not None else (o.error or "error") for o in outcomes)
+    return {
+        "requests": len(outcomes),
+        "target_rps": rps,
+        "offered_rps": len(outcomes) / sent_for if sent_for else float("nan"),
+        "elapsed_s": elapsed,
+        "ok": len(ok),
+        "statuses": dict(sorted(statuses.items())),
+        "throughput_rps": len(ok) / elapsed if elapsed else float("nan"),
+        "response_mib_s": sum(o.size for o in ok) / elapsed / 2**20 if elapsed else float("nan"),
+        "latency_s": {
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if latencies else float("nan"),
+            "mean": sum(latencies) / len(latencies) if latencies else float("nan"),
+        },
+        "client_wait_p95_s": percentile(waits, 95),
+        # Server-Timing of successful requests (stages done before the first byte)
+        "stage_mean_s": {name: total / len(ok) for name, total in sorted(stage_totals.items())},
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    lat = report["latency_s"]
+    print(f"requests      {report['requests']} at {report['offered_rps']:.2f}/s offered "
+          f"(target {report['target_rps']:.2f}/s)")
+    print(f"ok            {report['ok']}  statuses {report['statuses']}")
+    print(f"throughput    {report['throughput_rps']:.2f} req/s  {report['response_mib_s']:.2f} MiB/s "
+          f"over {report['elapsed_s']:.1f}s")
+    print("latency (s)   " + "  ".join(f"{k} {lat[k]:.3f}" for k in ("p50", "p90", "p95", "p99", "max", "mean")))
+    print(f"client wait   p95 {report['client_wait_p95_s']:.3f}s")
+    if report["stage_mean_s"]:
+        print("stages (mean) " + "  ".join(f"{k} {v:.3f}" for k, v in report["stage_mean_s"].items()))
+
+
+def make_log(files: str, count: int, pages: List[int], seed: int) -> Iterator[Dict[str, Any]]:
+    """Synthetic ocr-chunking bodies pointing at the stand-in's /files documents."""
+    rng = random.Random(seed)
+    for n in range(count):
+        page_count = rng.choice(pages)
+        yield {
+            "document_id": f"load-{n:05d}",
+            "url": f"{files.rstrip('/')}/files/doc-{n:05d}.pdf?pages={page_count}",
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run", help="replay a request log")
+    p.add_argument("log", type=Path)
+    p.add_argument("--target", default="http://127.0.0.1:8000", help="service base URL")
+    p.add_argument("--rps", type=float, default=1.0, help="target arrival rate")
+    p.add_argument("--duration", type=float, help="seconds to keep sending (loops the log)")
+    p.add_argument("--requests", type=int, help="number of requests to send (loops the log)")
+    p.add_argument("--max-in-flight", type=int, default=256, help="client-side concurrency cap")
+    p.add_argument("--timeout", type=float, default=600.0, help="per-request timeout in seconds")
+    p.add_argument("--poisson", action="store_true", help="exponential inter-arrival times")
+    p.add_argument("--unique", action="store_true", help="vary each document URL to defeat the OCR cache")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--json", type=Path, help="also write the report here")
+
+    m = sub.add_parser("make-log", help="write a synthetic log for the Azure DI stand-in to stdout")
+    m.add_argument("--files", default="http://127.0.0.1:5055", help="stand-in base URL")
+    m.add_argument("--count", type=int, default=100)
+    m.add_argument("--pages", default="1,5,20", help="comma-separated page counts to draw from")
+    m.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args(argv)
+    if args.command == "make-log":
+        pages = [int(p) for p in args.pages.split(",")]
+        for body in make_log(args.files, args.count, pages, args.seed):
+            sys.stdout.write(json.dumps(body) + "\n")
+        return 0
+
+    if args.rps <= 0:
+        parser.error("--rps must be positive")
+    entries = load_log(args.log)
+    report = asyncio.run(run(
+        entries,
+        target=args.target,
+        rps=args.rps,
+        duration=args.duration,
+        requests=args.requests,
+        max_in_flight=args.max_in_flight,
+        timeout=args.timeout,
+        poisson=args.poisson,
+        unique=args.unique,
+        seed=args.seed,
+    ))
+    print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+    return 0 if report["ok"] == report["requests"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""
+Benchmark suite: heading detection, sectioning, chunking, marker removal
+and response serialization on synthetic legal documents of 1 to 1,000 pages.
+
+Each case reports throughput (best of ``--repeat`` runs), peak traced memory
+and the number of memory blocks the result still holds, and is compared with
+a stored baseline. A case regresses when its throughput drops, or its peak
+memory or retained blocks grow, by more than ``--threshold``. Runs offline;
+baselines are only comparable on the machine that recorded them.
+
+    python -m benchmarks.suite                       # compare with benchmarks/baseline.json
+    python -m benchmarks.suite --pages 1,10 --cases find_headings,split_documents
+    python -m benchmarks.suite --save-baseline       # record this machine's baseline
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+os.environ.setdefault("AZURE_DI_ENDPOINT", "http://localhost")
+
+from langchain_core.documents import Document
+
+from app.api.schemas.ocr_chunking import OCRChunk, OCRChunkingResponse, OCRChunkRecord
+from app.services import chunk_export
+from app.services.chunking_service import chunk_service
+from app.services.ocr_service import ocr_service
+from app.utils.text_headings import find_headings
+from benchmarks.corpus import generate_legal_pages
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+
+BASE_METADATA = {
+    "file_name": "nghi-dinh-181-2025.pdf",
+    "checksum_sha256": "0" * 64,
+    "processed_at": "2025-07-01T00:00:00+00:00",
+    "content_type": "application/pdf",
+    "file_size": 1234567,
+    "source_type": "url",
+    "source": "https://example.com/nghi-dinh-181-2025.pdf",
+}
+
+# setup(pages) -> (input, bytes processed); the input is built outside the timing.
+# Cases whose function mutates its input get a fresh one for every run.
+Setup = Callable[[int], Tuple[Any, int]]
+Case = Tuple[Setup, Callable[[Any], Any], bool]
+
+
+def _raw_pages(pages: int) -> List[Document]:
+    return [
+        Document(page_content=text, metadata={**BASE_METADATA, "page_count": pages, "page_number": i})
+        for i, text in enumerate(generate_legal_pages(pages), start=1)
+    ]
+
+
+def _clean_pages(pages: int) -> List[Document]:
+    return ocr_service._remove_markers(_raw_pages(pages))
+
+
+def _size(docs: List[Document]) -> int:
+    return sum(len(d.page_content.encode("utf-8")) for d in docs)
+
+
+def _text_input(pages: int) -> Tuple[Any, int]:
+    text = "\n<!-- PageBreak -->\n".join(d.page_content for d in _raw_pages(pages))
+    return text, len(text.encode("utf-8"))
+
+
+def _raw_input(pages: int) -> Tuple[Any, int]:
+    docs = _raw_pages(pages)
+    return docs, _size(docs)
+
+
+def _clean_input(pages: int) -> Tuple[Any, int]:
+    docs = _clean_pages(pages)
+    return docs, _size(docs)
+
+
+def _chunks_input(pages: int) -> Tuple[Any, int]:
+    chunks = chunk_service.split_spans(_clean_pages(pages))
+    return chunks, sum(len(c.text.encode("utf-8")) for c in chunks)
+
+
+def _serialize_json(chunks: Any) -> str:
+    items = [OCRChunk(content=c.text, metadata=c.metadata()) for c in chunks]
+    return OCRChunkingResponse(document_id="bench", chunks=items, diff=None, duplicates=None).model_dump_json()
+
+
+def _serialize_ndjson(chunks: Any) -> str:
+    return "".join(OCRChunkRecord(content=c.text, metadata=c.metadata()).model_dump_json() + "\n" for c in chunks)
+
+
+def _serialize_arrow(chunks: Any) -> bytes:
+    return chunk_export.encode_table(chunk_export.chunk_table("bench", chunks), "arrow")
+
+
+CASES: Dict[str, Case] = {
+    "find_headings": (_text_input, find_headings, False),
+    "remove_markers": (_raw_input, ocr_service._remove_markers, True),
+    "split_docs_by_titles": (_clean_input, chunk_service._split_docs_by_titles, False),
+    "split_documents": (_clean_input, chunk_service.split_documents, False),
+    "serialize_json": (_chunks_input, _serialize_json, False),
+    "serialize_ndjson": (_chunks_input, _serialize_ndjson, False),
+}
+if chunk_export.available():
+    CASES["serialize_arrow"] = (_chunks_input, _serialize_arrow, False)
+
+
+def measure(case: Case, pages: int, repeat: int, min_time: float) -> Dict[str, float]:
+    setup, fn, mutates = case
+    best = float("inf")
+    runs = 0
+    total = 0.0
+    data, size = setup(pages)
+    fn(data)  # warm-up: lazy imports, compiled regexes, pydantic validators
+    gc.collect()
+    while runs < repeat or (total < min_time and runs < 10000):
+        if mutates:
+            data, _ = setup(pages)
+        t0 = time.perf_counter()
+        fn(data)
+        elapsed = time.perf_counter() - t0
+        best = min(best, elapsed)
+        total += elapsed
+        runs += 1
+
+    data, size = setup(pages)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        start_bytes = tracemalloc.get_traced_memory()[0]
+        result = fn(data)
+        peak = tracemalloc.get_traced_memory()[1] - start_bytes
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(s.count_diff for s in after.compare_to(before, "filename") if s.count_diff > 0)
+    del result
+    return {
+        "mb_s": size / best / 1e6,
+        "seconds": best,
+        "peak_kib": peak / 1024,
+        "blocks": blocks,
+        "runs": runs,
+    }
+
+
+def compare(current: Dict[str, float], base: Dict[str, float], threshold: float) -> List[str]:
+    problems = []
+    if current["mb_s"] < base["mb_s"] * (1 - threshold):
+        problems.append(f"throughput {current['mb_s']:.2f} < {base['mb_s']:.2f} MB/s")
+    if current["peak_kib"] > base["peak_kib"] * (1 + threshold) + 64:
+        problems.append(f"peak {current['peak_kib']:.0f} > {base['peak_kib']:.0f} KiB")
+    if current["blocks"] > base["blocks"] * (1 + threshold) + 16:
+        problems.append(f"blocks {current['blocks']:.0f} > {base['blocks']:.0f}")
+    return problems
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default="1,10,100,1000", help="comma-separated document sizes")
+    parser.add_argument("--cases", default=",".join(CASES), help="comma-separated case names")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-time", type=float, default=0.5, help="keep repeating small cases this long")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--json", type=Path, help="also write the results here")
+    args = parser.parse_args(argv)
+
+    sizes = [int(p) for p in args.pages.split(",")]
+    names = [n for n in args.cases.split(",") if n]
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)} (available: {', '.join(CASES)})")
+
+    baseline: Dict[str, Dict[str, float]] = {}
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text())["results"]
+
+    results: Dict[str, Dict[str, float]] = {}
+    regressions = 0
+    print(f"{'case':<32}{'MB/s':>10}{'peak KiB':>12}{'blocks':>10}  vs baseline")
+    for name in names:
+        for pages in sizes:
+            key = f"{name}/{pages}"
+            current = results[key] = measure(CASES[name], pages, args.repeat, args.min_time)
+            base = baseline.get(key)
+            if base is None:
+                verdict = "-"
+            else:
+                problems = compare(current, base, args.threshold)
+                regressions += bool(problems)
+                verdict = "REGRESSION: " + "; ".join(problems) if problems else f"ok ({current['mb_s'] / base['mb_s']:.2f}x)"
+            print(f"{key:<32}{current['mb_s']:>10.2f}{current['peak_kib']:>12.0f}{current['blocks']:>10.0f}  {verdict}")
+
+    report = {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+    if args.save_baseline:
+        if args.baseline.exists():
+            # Keep cases and sizes that were not re-run
+            report["results"] = {**json.loads(args.baseline.read_text())["results"], **results}
+        args.baseline.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+        print(f"baseline written to {args.baseline}")
+    if regressions:
+        print(f"{regressions} case(s) regressed by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""
+Production serving profile: one gunicorn master preloads and warms the app,
+then forks uvicorn workers that share its imported modules copy-on-write.
+
+    gunicorn -c docker/gunicorn.conf.py app.main:app
+
+WEB_CONCURRENCY sets the number of workers (default: one per CPU) and PORT
+the listening port (default 80). Per-process limits are per worker, e.g.
+AZURE_DI_MAX_CONCURRENCY and JOB_WORKERS apply once per worker.
+"""
+import gc
+import os
+import shutil
+
+from app.utils.startup import startup
+
+_cpus = os.cpu_count() or 1
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '80')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", _cpus))
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+# Workers heartbeat from their event loop; long OCR requests are awaited, not blocking
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+# Long enough for the lifespan to drain webhooks (WEBHOOK_DRAIN_TIMEOUT, 30s)
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "60"))
+keepalive = 5
+accesslog = "-"
+
+# Share the cores between the web workers and their chunking process pools
+os.environ.setdefault("CHUNK_POOL_WORKERS", str(max(1, _cpus // workers)))
+
+# Metrics of all workers are aggregated through files in this directory. It
+# must exist before the app is preloaded, and stale files of a previous run
+# would add to this run's counters. This file is read again on HUP, when the
+# live workers' files must be kept.
+_metrics_dir = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus-multiproc")
+if os.environ.get("PROMETHEUS_MULTIPROC_OWNER") != str(os.getpid()):
+    os.environ["PROMETHEUS_MULTIPROC_OWNER"] = str(os.getpid())
+    shutil.rmtree(_metrics_dir, ignore_errors=True)
+    os.makedirs(_metrics_dir, exist_ok=True)
+
+
+def when_ready(server):
+    # The app is imported (preload_app); load the heavy dependencies once here
+    # so every worker starts warm, then keep the GC from touching (and
+    # un-sharing) the pages of objects that now live for the whole process
+    startup.warm_up()
+    gc.freeze()
+    server.log.info("Preloaded app: %s", startup.status()["phases"])
+
+
+def child_exit(server, worker):
+    from app.utils.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)